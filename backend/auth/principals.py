@@ -0,0 +1,70 @@
+# backend/auth/principals.py
+import os
+import time
+from typing import Optional
+
+from jose import jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from response_cache import LRUBackend
+from . import security
+
+# How long a user looked up by token subject is reused before it is read again
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+# Upper bound on cached tokens and users each
+PRINCIPAL_CACHE_SIZE = 10_000
+
+_token_subjects = LRUBackend(maxsize=PRINCIPAL_CACHE_SIZE) # token -> subject, until the token's exp
+_principals = LRUBackend(maxsize=PRINCIPAL_CACHE_SIZE) # subject -> (user id, username)
+
+
+def token_subject(token: str) -> Optional[str]:
+    """
+    Verifies a JWT and returns its subject. The result is memoized per token until the
+    token expires, so repeated requests skip signature verification.
+    Raises JWTError for invalid or expired tokens.
+    """
+    subject = _token_subjects.get(token)
+    if subject is not None:
+        return subject
+
+    payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    subject = payload.get("sub")
+    if subject is None:
+        return None
+    ttl = payload["exp"] - time.time() if "exp" in payload else PRINCIPAL_CACHE_TTL_SECONDS
+    if ttl > 0:
+        _token_subjects.set(token, subject, ttl)
+    return subject
+
+
+async def get_principal(db: AsyncSession, username: str) -> Optional[models.User]:
+    """
+    Returns the user with this username, read from the database at most once per TTL.
+    The returned object is detached from any session and only carries id and username.
+    """
+    cached = _principals.get(username)
+    if cached is None:
+        user = await db.scalar(select(models.User).where(models.User.username == username))
+        if user is None:
+            return None
+        cached = (user.id, user.username)
+        _principals.set(username, cached, PRINCIPAL_CACHE_TTL_SECONDS)
+    return models.User(id=cached[0], username=cached[1])
+
+
+def invalidate_principals(username: Optional[str] = None):
+    """Drops one cached user, or all of them. Call this whenever users change."""
+    if username is None:
+        _principals.invalidate()
+    else:
+        _principals.delete(username)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target):
+    # The username itself may have changed, so drop every cached user
+    invalidate_principals()
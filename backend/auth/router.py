@@ -1,12 +1,14 @@
 # backend/auth/router.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
-from jose import JWTError, jwt
+from jose import JWTError
 from typing import List
 
 from . import security
+from .principals import get_principal, token_subject
 import models
 from database import get_db
 
@@ -16,13 +18,29 @@ router = APIRouter()
 # Define the token endpoint URL and the security scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+
 @router.post("/token")
-def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session = Depends(get_db)):
+async def login_for_access_token(
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: AsyncSession = Depends(get_db),
+):
     """
     Handles the login request. Takes username and password from a form body.
+    The bcrypt check runs on the dedicated hashing pool, and a password hashed with an
+    outdated work factor is transparently rehashed with the current one.
     """
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(models.User).where(models.User.username == form_data.username))
+    try:
+        verified = user is not None and await security.hashing_pool.verify(form_data.password, user.hashed_password)
+        if verified and security.password_needs_rehash(user.hashed_password):
+            user.hashed_password = await security.hashing_pool.hash(form_data.password)
+            await db.commit()
+    except security.HashingPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, please retry.",
+            headers={"Retry-After": "1"},
+        )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -31,10 +49,12 @@ def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depen
     access_token = security.create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)):
     """
     This is the dependency that will protect our routes.
     It decodes the token, validates it, and fetches the user from the database.
+    Both steps are cached, so repeated requests with the same token are dictionary lookups.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,14 +62,13 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        username: str = payload.get("sub")
+        username = token_subject(token)
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = await get_principal(db, username)
     if user is None:
         raise credentials_exception
     return user
@@ -1,10 +1,16 @@
 # backend/auth/security.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import os
 
+from metrics import REGISTRY
+
 # --- Configuration ---
 # This is a hardcoded key for development. In a real production environment,
 # you would load this from a secure environment variable or a secret manager.
@@ -12,17 +18,107 @@ SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_key_for_a_portfolio_project"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt work factor. Each +1 doubles the cost; use a low value (e.g. 4) in tests only.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dedicated to hashing, and how many calls may wait for one before new ones are rejected
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
 # Setup for password hashing. bcrypt is the standard, secure algorithm.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain password against a hashed one."""
     return pwd_context.verify(plain_password, hashed_password)
 
+
 def get_password_hash(password: str) -> str:
     """Hashes a plain password."""
     return pwd_context.hash(password)
 
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if a hash was made with a different work factor (or scheme) than the current one."""
+    return pwd_context.needs_update(hashed_password)
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when too many hashing calls are already waiting for a worker."""
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt on a small dedicated thread pool so that slow hashes never block the
+    event loop or tie up the request threadpool. The number of waiting calls is bounded,
+    and counters for saturation (in flight, queued, wait times) are kept for metrics.
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0 # Submitted calls that have not finished, running or queued
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolSaturated()
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def call():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._running += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._total_wait,
+                "wait_seconds_max": self._max_wait,
+            }
+
+
+hashing_pool = PasswordHashingPool()
+REGISTRY.gauge(
+    "password_hashing_calls", "Password hashing calls running or waiting for a worker.",
+    lambda: {(state,): hashing_pool.stats()[state] for state in ("running", "queued")}, ("state",),
+)
+
+
 # --- JWT Token Logic ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Creates a new JWT access token."""
@@ -0,0 +1,169 @@
+# backend/benchmarks/cold_start.py
+"""
+Measures the cold start of the API the way a fresh Cloud Run instance sees it.
+
+Seeds a scratch database and publishes a model from synthetic data (like benchmarks/api.py),
+then starts several fresh Python processes. Each one reports:
+
+  import         time to `import main`
+  startup        the lifespan: loading the similarity model and checking migrations
+  first/second   latency of the first and second request to a few endpoints
+  heavy modules  any of pandas, sklearn, scipy, joblib or pyarrow the process imported
+
+It also times a from-scratch `build_model` in a fresh process with empty caches, the way
+the scheduled model build job runs it; the serving container only loads the published
+model. Medians over the runs are printed and written as JSON to
+benchmarks/results/cold_start-<commit>.json.
+
+Run from the backend directory:
+    python -m benchmarks.cold_start --players 1000 --seasons 10 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.api import RESULTS_DIR, configure_environment, git_commit, run_pipeline
+from benchmarks.synthetic import LAST_SEASON, write_seasons
+
+# Modules only the offline build needs; the serving process must not import them
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib", "pyarrow")
+
+
+def endpoint_paths(player_id, season):
+    return {
+        "players": "/api/players?limit=100",
+        "player": f"/api/players/{player_id}",
+        "similar": f"/api/players/{player_id}/seasons/{season}/similar?k=10",
+        "career_similar": f"/api/players/{player_id}/career/similar?k=10",
+        "leaders": f"/api/seasons/{season}/leaders/points_per_game",
+    }
+
+
+async def _serve_requests(app, paths):
+    import httpx
+
+    latencies = {}
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup = time.perf_counter() - start
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://cold-start") as client:
+            for name, path in paths.items():
+                timings = []
+                for _ in range(2):
+                    request_start = time.perf_counter()
+                    response = await client.get(path)
+                    timings.append(time.perf_counter() - request_start)
+                    response.raise_for_status()
+                latencies[name] = timings
+    return startup, latencies
+
+
+def child(paths):
+    """Runs in a fresh process: imports the app, starts it and sends each request twice."""
+    start = time.perf_counter()
+    from main import app
+    import_seconds = time.perf_counter() - start
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    startup, latencies = asyncio.run(_serve_requests(app, paths))
+    print(json.dumps({
+        "import_seconds": import_seconds, "startup_seconds": startup, "heavy_modules": heavy,
+        "first_request_seconds": {name: timings[0] for name, timings in latencies.items()},
+        "second_request_seconds": {name: timings[1] for name, timings in latencies.items()},
+    }))
+
+
+def _run_process(*args, env=None):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env).stdout
+    return time.perf_counter() - start, output
+
+
+def build_environment(workdir):
+    """Settings of a build job's first run: empty caches, publishing apart from the served model."""
+    return {
+        **os.environ,
+        "SEASON_CACHE_DIR": os.path.join(workdir, "build_job", "season_cache"),
+        "MODEL_CACHE_DIR": os.path.join(workdir, "build_job", "model_cache"),
+        "SIMILARITY_MODEL_DIR": os.path.join(workdir, "build_job", "similarity_model"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time, startup and first-request latency of the API.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to start; medians are reported.")
+    parser.add_argument("--database-url", help="A scratch database; its tables are dropped. Default: a temporary SQLite file.")
+    parser.add_argument(
+        "--output", help="Where to write the JSON results. Default: benchmarks/results/cold_start-<commit>.json",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS) # Request paths, as JSON, of a measured process
+    args = parser.parse_args()
+
+    if args.child:
+        return child(json.loads(args.child))
+
+    # The cold start is the subject here, so the response cache stays as in production
+    args.response_cache = True
+    with tempfile.TemporaryDirectory(prefix="wnba-cold-start-") as workdir:
+        configure_environment(args, workdir)
+        files = write_seasons(os.path.join(workdir, "data"), args.players, args.seasons)
+        logging.basicConfig(level=logging.WARNING)
+        run_pipeline(files)
+        paths = endpoint_paths(player_id=1, season=str(LAST_SEASON))
+
+        build_seconds, _ = _run_process(
+            "-c", f"from build_similarity_model import build_model; build_model({files!r}, full=True)",
+            env=build_environment(workdir),
+        )
+        runs = [
+            json.loads(_run_process("-m", "benchmarks.cold_start", "--child", json.dumps(paths))[1])
+            for _ in range(args.runs)
+        ]
+
+        from sqlalchemy.engine import make_url
+        database = make_url(os.environ["DATABASE_URL"]).get_backend_name()
+
+    def median(key, name=None):
+        return statistics.median(run[key] if name is None else run[key][name] for run in runs)
+
+    commit = git_commit()
+    result = {
+        "meta": {
+            "commit": commit, "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": database, "players": args.players, "seasons": args.seasons, "runs": args.runs,
+        },
+        "build_model_process_seconds": build_seconds,
+        "import_seconds": median("import_seconds"),
+        "startup_seconds": median("startup_seconds"),
+        "first_request_seconds": {name: median("first_request_seconds", name) for name in paths},
+        "second_request_seconds": {name: median("second_request_seconds", name) for name in paths},
+        "heavy_modules": sorted({name for run in runs for name in run["heavy_modules"]}),
+    }
+
+    print(f"build_model process (from scratch)     {build_seconds * 1e3:>9.1f} ms")
+    print(f"import main                            {result['import_seconds'] * 1e3:>9.1f} ms")
+    print(f"startup (model load, migrations)       {result['startup_seconds'] * 1e3:>9.1f} ms")
+    print(f"\n{'endpoint':<16} {'first (ms)':>11} {'second (ms)':>12}")
+    for name in paths:
+        first, second = result["first_request_seconds"][name], result["second_request_seconds"][name]
+        print(f"{name:<16} {first * 1e3:>11.2f} {second * 1e3:>12.2f}")
+    print(f"\nHeavy modules imported by the API: {', '.join(result['heavy_modules']) or 'none'}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"cold_start-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
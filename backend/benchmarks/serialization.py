@@ -0,0 +1,118 @@
+# backend/benchmarks/serialization.py
+"""
+Compares ways of encoding the full roster payload of GET /api/players.
+
+  pydantic+json    ORM objects validated through response_model, then json.dumps
+                   (FastAPI's default path)
+  pydantic+orjson  the same validation, encoded with orjson
+  rows+orjson      dicts built from row tuples, encoded with orjson (the API's path)
+
+For each it reports the time per encode and the peak memory allocated while encoding.
+
+Run from the backend directory:
+    python -m benchmarks.serialization
+"""
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from main import Player, STAT_FIELDS
+
+ROSTER_SIZES = [150, 1_500]
+SEASONS_PER_PLAYER = 5
+REPEATS = 50
+
+PLAYERS = TypeAdapter(List[Player])
+# Stat values shared by every line; season, team and ids are set per line
+STAT_VALUES = dict(
+    points_per_game=15.2, rebounds_per_game=6.1, assists_per_game=3.4, games_played=34, games_started=30,
+    field_goal_percentage=0.456, three_point_percentage=0.351, steals_per_game=1.2, blocks_per_game=0.6,
+    player_efficiency_rating=17.8,
+)
+# Position of the player id in a stat row
+PLAYER_ID = STAT_FIELDS.index("player_id")
+
+
+def _rows(num_players):
+    """Player and stat row tuples shaped like the API's queries return them, in STAT_FIELDS order."""
+    players = [("First", f"Last{i}", "AAA", i) for i in range(1, num_players + 1)]
+    stats = []
+    for p in range(1, num_players + 1):
+        for s in range(SEASONS_PER_PLAYER):
+            line = {**STAT_VALUES, "season": str(2020 + s), "team": "AAA", "id": p * 10 + s, "player_id": p}
+            stats.append(tuple(line[field] for field in STAT_FIELDS))
+    return players, stats
+
+
+def _orm_objects(players, stats):
+    by_player = {}
+    for row in stats:
+        by_player.setdefault(row[PLAYER_ID], []).append(SimpleNamespace(**dict(zip(STAT_FIELDS, row))))
+    return [
+        SimpleNamespace(first_name=first, last_name=last, team=team, id=player_id, stats=by_player[player_id])
+        for first, last, team, player_id in players
+    ]
+
+
+def pydantic_json(objects):
+    return json.dumps(jsonable_encoder(PLAYERS.validate_python(objects)), separators=(",", ":")).encode()
+
+
+def pydantic_orjson(objects):
+    return orjson.dumps(PLAYERS.dump_python(PLAYERS.validate_python(objects)))
+
+
+def rows_orjson(players, stats):
+    payload = [
+        dict(first_name=first, last_name=last, team=team, id=player_id, stats=[]) for first, last, team, player_id in players
+    ]
+    by_id = {player["id"]: player["stats"] for player in payload}
+    for row in stats:
+        by_id[row[PLAYER_ID]].append(dict(zip(STAT_FIELDS, row)))
+    return orjson.dumps(payload)
+
+
+def _measure(encode):
+    encode() # Warm up
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        encode()
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    tracemalloc.start()
+    body = encode()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(body)
+
+
+def run(sizes=ROSTER_SIZES):
+    results = []
+    for n in sizes:
+        players, stats = _rows(n)
+        objects = _orm_objects(players, stats)
+        encoders = {
+            "pydantic+json": lambda: pydantic_json(objects),
+            "pydantic+orjson": lambda: pydantic_orjson(objects),
+            "rows+orjson": lambda: rows_orjson(players, stats),
+        }
+        # Every path must produce the same document
+        assert len({json.dumps(json.loads(encode()), sort_keys=True) for encode in encoders.values()}) == 1
+        results.extend((name, n) + _measure(encode) for name, encode in encoders.items())
+    return results
+
+
+def main():
+    print(f"{'encoder':<16} {'players':>8} {'encode (ms)':>12} {'peak alloc (KB)':>16} {'body (KB)':>10}")
+    for name, n, elapsed, peak, size in run():
+        print(f"{name:<16} {n:>8} {elapsed * 1e3:>12.2f} {peak / 1e3:>16.0f} {size / 1e3:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/benchmarks/similarity_index.py
+"""
+Compares the dense N x N similarity matrix against the SimilarityIndex.
+
+For each N it reports artifact size, load time and the latency of one
+/similar-style query (top 5 neighbours of one row), plain and with feature weights. The dense matrix is skipped
+above DENSE_LIMIT rows because it no longer fits in memory.
+
+Run from the backend directory:
+    python -m benchmarks.similarity_index
+"""
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from similarity_index import SimilarityIndex, pack_keys
+
+SIZES = [500, 5_000, 50_000]
+NUM_FEATURES = 9
+DENSE_LIMIT = 10_000
+QUERY_REPEATS = 200
+
+
+def _time_queries(top_k_fn, n):
+    rng = np.random.default_rng(1)
+    targets = rng.integers(0, n, size=QUERY_REPEATS)
+    start = time.perf_counter()
+    for idx in targets:
+        top_k_fn(idx)
+    return (time.perf_counter() - start) / QUERY_REPEATS
+
+
+def _dense_top_k(matrix):
+    def top_k(idx):
+        scores = np.array(matrix[idx])
+        scores[idx] = -np.inf
+        candidates = np.argpartition(-scores, 4)[:5]
+        return candidates[np.argsort(-scores[candidates])]
+    return top_k
+
+
+def _artifact_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def _measure(path, save, load, top_k_fn_from, n):
+    save(path)
+    size = _artifact_size(path)
+    start = time.perf_counter()
+    loaded = load(path)
+    load_time = time.perf_counter() - start
+    return size, load_time, _time_queries(top_k_fn_from(loaded), n)
+
+
+def run(sizes=SIZES):
+    rng = np.random.default_rng(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            features = rng.normal(size=(n, NUM_FEATURES))
+            labels = [f"Player {i} (2024)" for i in range(n)]
+
+            feature_names = [f"F{i}" for i in range(NUM_FEATURES)]
+            index = SimilarityIndex.from_features(labels, features, pack_keys(range(n), [2024] * n), feature_names)
+            rows.append(("index", n) + _measure(
+                os.path.join(tmp, f"index_{n}"), index.save, SimilarityIndex.load,
+                lambda loaded: lambda idx: loaded.top_k(idx, 5), n,
+            ))
+            # Per-request feature weights; the weighted matrix is built on the first query and cached
+            weights = index.feature_weights({"F0": 3.0, "F1": 2.0, "F2": 1.0})
+            rows.append(("weighted", n) + _measure(
+                os.path.join(tmp, f"weighted_{n}"), index.save, SimilarityIndex.load,
+                lambda loaded: lambda idx: loaded.top_k(idx, 5, weights), n,
+            ))
+
+            if n <= DENSE_LIMIT:
+                matrix = cosine_similarity(features)
+                rows.append(("dense", n) + _measure(
+                    os.path.join(tmp, f"dense_{n}.joblib"), lambda p: joblib.dump(matrix, p), joblib.load,
+                    _dense_top_k, n,
+                ))
+                del matrix
+            else:
+                rows.append(("dense", n, n * n * 8, None, None))
+    return rows
+
+
+def main():
+    print(f"{'artifact':<8} {'N':>7} {'size (MB)':>10} {'load (ms)':>10} {'query (ms)':>11}")
+    for kind, n, size, load_time, query_time in run():
+        if load_time is None:
+            print(f"{kind:<8} {n:>7} {size / 1e6:>10.1f} {'skipped':>10} {'skipped':>11}")
+        else:
+            print(f"{kind:<8} {n:>7} {size / 1e6:>10.1f} {load_time * 1e3:>10.1f} {query_time * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/synthetic.py
+"""
+Generates synthetic season files in the format of data/wnba_combined_<year>.json, so the
+seeder, the model build and the API can be benchmarked at sizes the real data never reaches.
+
+Every player plays every season. A player has a base skill profile that drifts a little
+from season to season, and a share of players is traded each season: they get one row
+per team plus a 'TOT' row with their season totals, like the source data.
+
+Run from the backend directory:
+    python -m benchmarks.synthetic --players 1000 --seasons 10 --out /tmp/wnba_synthetic
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+# Teams players are spread over
+TEAMS = [f"T{number:02d}" for number in range(1, 13)]
+# Share of players that play for two teams in a season
+TRADED_SHARE = 0.05
+# Last generated season; earlier ones count down from it
+LAST_SEASON = 2025
+# Per-game means and spreads of the stats that are stored as season totals
+PER_GAME = {"PTS": (9.0, 5.0), "TRB": (4.0, 2.0), "AST": (2.0, 1.5), "STL": (0.8, 0.4), "BLK": (0.4, 0.4)}
+
+
+def player_name(number):
+    """The synthetic player's name; the seeder splits it into 'First<n>' and 'Last<n>'."""
+    return f"First{number} Last{number}"
+
+
+def season_rows(rng, base, teams, year_offset):
+    """The rows of one season for every player, with traded players split over two teams."""
+    num_players = len(teams)
+    drift = rng.normal(1.0, 0.1, size=(num_players, len(PER_GAME)))
+    per_game = np.clip(base * drift, 0.0, None)
+    games = rng.integers(10, 41, size=num_players)
+    started = (games * rng.uniform(0, 1, size=num_players)).astype(int)
+    fg = np.clip(rng.normal(0.43, 0.05, size=num_players), 0.2, 0.7)
+    three = np.clip(rng.normal(0.33, 0.07, size=num_players), 0.0, 0.6)
+    per = np.clip(rng.normal(15.0, 5.0, size=num_players), -5.0, 40.0)
+    win_shares = np.clip(rng.normal(1.5, 1.2, size=num_players), -1.0, 10.0)
+    traded = rng.uniform(size=num_players) < TRADED_SHARE
+
+    rows = []
+    for p in range(num_players):
+        totals = {stat: round(float(per_game[p, s] * games[p])) for s, stat in enumerate(PER_GAME)}
+        row = {
+            "Player": player_name(p + 1), "Team": teams[p], "G": int(games[p]), "GS": int(started[p]),
+            **totals, "FG%": round(float(fg[p]), 3), "3P%": round(float(three[p]), 3),
+            "PER": round(float(per[p]), 1), "WS": round(float(win_shares[p]), 1),
+        }
+        if not traded[p]:
+            rows.append(row)
+            continue
+        # The season total comes first, then one partial row per team
+        rows.append({**row, "Team": "TOT"})
+        first_games = int(games[p]) // 2
+        new_team = TEAMS[(TEAMS.index(teams[p]) + 1 + year_offset) % len(TEAMS)]
+        for team, team_games in ((teams[p], first_games), (new_team, int(games[p]) - first_games)):
+            share = team_games / max(int(games[p]), 1)
+            rows.append({
+                **row, "Team": team, "G": team_games, "GS": min(int(row["GS"] * share), team_games),
+                **{stat: round(total * share) for stat, total in totals.items()},
+            })
+        teams[p] = new_team
+    return rows
+
+
+def write_seasons(directory, num_players, num_seasons, seed=0):
+    """Writes one season file per season into `directory` and returns their paths, oldest first."""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    means = np.array([mean for mean, _ in PER_GAME.values()])
+    spreads = np.array([spread for _, spread in PER_GAME.values()])
+    base = np.clip(rng.normal(means, spreads, size=(num_players, len(PER_GAME))), 0.0, None)
+    teams = [TEAMS[p % len(TEAMS)] for p in range(num_players)]
+
+    files = []
+    for offset, year in enumerate(range(LAST_SEASON - num_seasons + 1, LAST_SEASON + 1)):
+        path = os.path.join(directory, f"wnba_combined_{year}.json")
+        with open(path, "w") as f:
+            json.dump(season_rows(rng, base, teams, offset), f)
+        files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic season files.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Directory the season files are written to.")
+    args = parser.parse_args()
+    for path in write_seasons(args.out, args.players, args.seasons, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 # backend/build_similarity_model.py
 
+import argparse
+import hashlib
 import logging
+import os
 import pandas as pd
-import joblib
 import json
 
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
+
+from database import SessionLocal
+from model_registry import ModelRegistry
+from models import Player
+from season_data import file_fingerprint, read_season
+from seed_database import split_name
+from similarity_index import SimilarityIndex, pack_keys
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,58 +23,148 @@ logger = logging.getLogger(__name__)
 DATA_FILES = [
     'data/wnba_combined_2024.json',
 ]
+FEATURES = [
+    'PTS', 'TRB', 'AST', 'STL', 'BLK', 'FG%', '3P%', 'PER', 'WS'
+]
 
-def build_model():
-    logger.info("Loading player data from JSON files...")
-
-    all_seasons_df = []
-    for file_name in DATA_FILES:
-        year = file_name.split('_')[2].split('.')[0]
-        with open(file_name, 'r') as f:
-            season_data = json.load(f)
-
-            # Add a 'season' column to each record
-            for record in season_data:
-                record['season'] = year
-
-            all_seasons_df.append(pd.DataFrame(season_data))
-
-    df = pd.concat(all_seasons_df, ignore_index=True)
-
-    # Clean player names and handle multi-team players ('TOT')
-    df['Player'] = df['Player'].str.replace('*', '', regex=False)
-    df = df[df['Team'] != 'TOT'] # Exclude total rows
-    df = df.dropna(subset=['Player']) # Drop rows with no player name
+# Holds the build manifest; cleaned season data is cached by season_data
+CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+# Records which inputs (and which model version) the last build was made from
+MANIFEST_FILE = "build_manifest.json"
 
-    logger.info(f"Successfully loaded {len(df)} total player seasons.")
 
-    # Define the unique ID and the features for the model
-    df['player_season_id'] = df['Player'] + ' (' + df['season'] + ')'
-    features = [
-        'PTS', 'TRB', 'AST', 'STL', 'BLK', 'FG%', '3P%', 'PER', 'WS'
-    ]
+def load_season_features(file_name, fingerprint):
+    """
+    Returns the feature rows of one season, one per player, like the seeder stores them:
+    a traded player's 'TOT' row supplies the features and their first real team is kept.
+    Only the needed columns are read from the cleaned columnar cache of the season file.
+    Returns the frame (Player, Team, season and the features) and whether the cache was reused.
+    """
+    df, cached = read_season(file_name, ['Player', 'Team', 'season'] + FEATURES, fingerprint)
     # Ensure all feature columns exist and fill NaNs with 0
-    for feature in features:
+    for feature in FEATURES:
         if feature not in df.columns:
-            df[feature] = 0
-    df[features] = df[features].fillna(0)
+            df[feature] = 0.0
+    df[FEATURES] = df[FEATURES].fillna(0)
+
+    is_total = df['Team'] == 'TOT'
+    # Players with only a 'TOT' row are skipped, since the seeder can't find a real team for them
+    teams = df.loc[~is_total, ['Player', 'Team']].drop_duplicates('Player')
+    stats = pd.concat([df[is_total], df[~is_total]]).drop_duplicates('Player') # 'TOT' rows first
+    return teams.merge(stats.drop(columns='Team'), on='Player'), cached
+
+
+def load_players(db):
+    """Maps (first_name, last_name) to the (id, team) of every player in the database with that name."""
+    players = {}
+    rows = db.query(Player.id, Player.first_name, Player.last_name, Player.team).order_by(Player.id)
+    for player_id, first_name, last_name, team in rows:
+        players.setdefault((first_name, last_name), []).append((player_id, team))
+    return players
+
+
+def resolve_player_ids(df, players):
+    """
+    Returns the database id of every row's player, or -1 if it can't be told apart.
+    Names are split exactly like the seeder splits them; players who share a name are
+    told apart by their team.
+    """
+    ids = []
+    for name, team in zip(df['Player'], df['Team']):
+        candidates = players.get(split_name(name), [])
+        if len(candidates) > 1:
+            candidates = [candidate for candidate in candidates if candidate[1] == team]
+        ids.append(candidates[0][0] if len(candidates) == 1 else -1)
+    return ids
+
+
+def _players_fingerprint(players):
+    return hashlib.sha256(json.dumps(sorted(players.items())).encode()).hexdigest()
+
+
+def _read_manifest():
+    try:
+        with open(os.path.join(CACHE_DIR, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def build_model(data_files=DATA_FILES, full=False):
+    """
+    Builds and publishes the similarity model.
+
+    Player-seasons are keyed by (player id, season), so the database must have been
+    seeded from the same files first; rows whose player can't be resolved are left out.
+
+    Unless `full` is set the build is incremental: only season files whose fingerprint
+    changed are re-parsed into the columnar cache, and nothing is published when no
+    input (files or players) changed since the currently served version. Scaling is
+    refit over all seasons each time because every vector depends on the global means,
+    but that step is O(N * features).
+    Returns the published (or already current) model version.
+    """
+    registry = ModelRegistry()
+    db = SessionLocal()
+    try:
+        players = load_players(db)
+    finally:
+        db.close()
+    fingerprints = {file_name: file_fingerprint(file_name) for file_name in data_files}
+    fingerprints["players"] = _players_fingerprint(players)
+
+    manifest = _read_manifest()
+    if not full and manifest.get("inputs") == fingerprints and manifest.get("version") == registry.current_version():
+        logger.info(f"Inputs are unchanged; model version {manifest['version']} is up to date.")
+        return manifest["version"]
 
-    df_features = df.set_index('player_season_id')[features]
+    logger.info("Loading player data from JSON files...")
+    all_seasons_df = []
+    for file_name in data_files:
+        df_season, cached = load_season_features(file_name, fingerprints[file_name])
+        logger.info(f"{file_name}: {len(df_season)} player seasons ({'cached' if cached else 'parsed'}).")
+        all_seasons_df.append(df_season)
+
+    df_features = pd.concat(all_seasons_df, ignore_index=True)
+    df_features['player_id'] = resolve_player_ids(df_features, players)
+    unresolved = df_features['player_id'] < 0
+    if unresolved.any():
+        logger.warning(
+            f"Skipping {unresolved.sum()} player seasons whose player is missing from the database "
+            f"or ambiguous, e.g. {', '.join(df_features.loc[unresolved, 'Player'].head(5))}."
+        )
+        df_features = df_features[~unresolved]
+    if df_features.empty:
+        raise ValueError("No player seasons match players in the database. Run seed_database.py first.")
+    logger.info(f"Successfully loaded {len(df_features)} total player seasons.")
 
     # Normalize the data
     scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(df_features)
+    scaled_features = scaler.fit_transform(df_features[FEATURES])
     logger.info("Features have been scaled.")
 
-    # Calculate Cosine Similarity
-    similarity_matrix = cosine_similarity(scaled_features)
-    logger.info("Similarity matrix has been calculated.")
+    # Store the normalized vectors, plus the standardized features for weighted queries
+    index = SimilarityIndex.from_features(
+        df_features['Player'] + ' (' + df_features['season'] + ')', scaled_features,
+        pack_keys(df_features['player_id'], df_features['season'].astype(int)), FEATURES,
+    )
+    logger.info(f"Similarity index has been built over {len(index)} player seasons.")
+
+    # Publish the artifacts as a new version; running APIs pick it up without a restart
+    version = registry.publish(index)
+    _write_manifest({"inputs": fingerprints, "version": version})
 
-    # Save the artifacts
-    joblib.dump(df_features, 'similarity_data.joblib')
-    joblib.dump(similarity_matrix, 'similarity_matrix.joblib')
+    logger.info(f"Model artifacts have been saved successfully as version {version}!")
+    return version
 
-    logger.info("Model artifacts have been saved successfully!")
 
 if __name__ == "__main__":
-    build_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the player similarity model.")
+    parser.add_argument("--full", action="store_true", help="Always publish a new version, even if no input changed.")
+    build_model(full=parser.parse_args().full)
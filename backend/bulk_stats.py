@@ -0,0 +1,134 @@
+# backend/bulk_stats.py
+import json
+import logging
+import os
+
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from models import Player, PlayerStat
+from season_summary import mark_seasons_stale
+
+logger = logging.getLogger(__name__)
+
+# Stat lines written per transaction
+BATCH_SIZE = 1000
+# Upper bound on the stat lines accepted by one request
+MAX_ROWS = 50_000
+# Upper bound on the size of a request body, checked before and while it is read
+MAX_BODY_BYTES = int(os.getenv("BULK_STATS_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+# Values bound per IN lookup, well under the parameter limits of SQLite and asyncpg
+LOOKUP_CHUNK_SIZE = 500
+# Content types read as one JSON document per line
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+
+def parse_rows(body: bytes, content_type: str):
+    """
+    Returns the rows of a bulk request body: either a JSON array or NDJSON, one object per line.
+    Rows that are not valid JSON are returned as the json.JSONDecodeError raised for them.
+    Raises ValueError if the body as a whole can't be read.
+    """
+    if content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                rows.append(e)
+    else:
+        try:
+            rows = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Body is not valid JSON: {e}")
+        if not isinstance(rows, list):
+            raise ValueError("Body must be a JSON array of stat lines, or NDJSON.")
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"At most {MAX_ROWS} stat lines can be sent per request.")
+    return rows
+
+
+def _chunks(values):
+    """Splits `values` into lists of at most LOOKUP_CHUNK_SIZE."""
+    values = list(values)
+    return [values[start:start + LOOKUP_CHUNK_SIZE] for start in range(0, len(values), LOOKUP_CHUNK_SIZE)]
+
+
+def write_stat_rows(db: Session, rows):
+    """
+    Inserts new stat lines and updates existing ones, matched by (player_id, season).
+    `rows` is a list of (position, values) with validated PlayerStat column values. Lines
+    without a team get the player's current team when created and keep theirs when updated.
+
+    Players and existing lines are looked up with IN queries of LOOKUP_CHUNK_SIZE, and rows are written
+    with executemany statements in transactions of BATCH_SIZE. Each batch marks its seasons
+    stale, so their leaderboards are rebuilt by the next read.
+    Returns {position: (status, stat id, detail)}.
+    """
+    results = {}
+    player_ids = {values["player_id"] for _, values in rows}
+    teams = {}
+    for chunk in _chunks(player_ids):
+        teams.update(db.execute(select(Player.id, Player.team).where(Player.id.in_(chunk))).all())
+    known_players = set(teams)
+    existing = {
+        (player_id, season): stat_id
+        for chunk in _chunks(known_players)
+        for stat_id, player_id, season in db.execute(
+            select(PlayerStat.id, PlayerStat.player_id, PlayerStat.season).where(PlayerStat.player_id.in_(chunk))
+        )
+    }
+
+    pending = []
+    for position, values in rows:
+        if values["player_id"] not in known_players:
+            results[position] = ("error", None, "Player not found")
+            continue
+        if values.get("team") is None:
+            values = {key: value for key, value in values.items() if key != "team"}
+            if (values["player_id"], values["season"]) not in existing:
+                values["team"] = teams[values["player_id"]]
+        pending.append((position, values))
+
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = pending[start:start + BATCH_SIZE]
+        new_rows = [
+            (position, values) for position, values in batch if (values["player_id"], values["season"]) not in existing
+        ]
+        changed_rows = [
+            (position, {**values, "id": existing[(values["player_id"], values["season"])]})
+            for position, values in batch if (values["player_id"], values["season"]) in existing
+        ]
+        new_ids = {}
+        try:
+            if new_rows:
+                db.execute(insert(PlayerStat), [values for _, values in new_rows])
+                # Read the new ids back with one query per chunk; RETURNING would force row-by-row inserts on some drivers
+                new_keys = [(values["player_id"], values["season"]) for _, values in new_rows]
+                new_ids = dict(
+                    ((player_id, season), stat_id)
+                    for chunk in _chunks(new_keys)
+                    for stat_id, player_id, season in db.execute(
+                        select(PlayerStat.id, PlayerStat.player_id, PlayerStat.season)
+                        .where(tuple_(PlayerStat.player_id, PlayerStat.season).in_(chunk))
+                    )
+                )
+            if changed_rows:
+                db.execute(update(PlayerStat), [values for _, values in changed_rows])
+            # Leaderboards and aggregates of the batch's seasons are rebuilt by their next read
+            mark_seasons_stale(db, {values["season"] for _, values in batch})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Bulk stats batch starting at row {batch[0][0]} failed: {e}", exc_info=True)
+            results.update((position, ("error", None, "Write failed, batch rolled back")) for position, _ in batch)
+            continue
+
+        existing.update(new_ids)
+        results.update(
+            (position, ("created", new_ids[(values["player_id"], values["season"])], None)) for position, values in new_rows
+        )
+        results.update((position, ("updated", values["id"], None)) for position, values in changed_rows)
+    return results
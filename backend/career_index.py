@@ -0,0 +1,78 @@
+# backend/career_index.py
+import numpy as np
+
+from similarity_index import SEASON_BITS, SimilarityIndex, select_top_k
+
+# Seasons of a career that are embedded; later seasons are ignored
+MAX_CAREER_SEASONS = 20
+
+
+class CareerIndex:
+    """
+    Career-arc similarity over the standardized per-season features of a SimilarityIndex.
+
+    Every player's seasons are aligned by season index (first season, second season, ...)
+    into a fixed-length (MAX_CAREER_SEASONS, features) embedding, zero-padded and masked by
+    career length. Comparing the first N seasons of two careers is the cosine similarity
+    of their first N * features values, so a query scores every player with one
+    (players, N, features) contraction using precomputed prefix norms, instead of
+    aligning seasons pair by pair.
+    """
+
+    def __init__(self, player_ids, names, seasons, features, lengths):
+        self.player_ids = np.asarray(player_ids, dtype=np.int64) # Sorted
+        self.names = list(names)
+        self.seasons = np.asarray(seasons, dtype=np.int64) # (players, max seasons), 0 = padding
+        self.features = np.asarray(features, dtype=np.float32) # (players, max seasons, features)
+        self.lengths = np.asarray(lengths, dtype=np.intp)
+        # prefix_norms[p, n - 1] is the norm of player p's first n seasons
+        self.prefix_norms = np.sqrt(np.cumsum(np.square(self.features).sum(axis=2), axis=1))
+
+    @classmethod
+    def from_index(cls, index: SimilarityIndex, max_seasons=MAX_CAREER_SEASONS):
+        """Builds the career embeddings from an index built with per-feature data."""
+        if index.features is None:
+            raise ValueError("Career similarity needs a model built with per-feature data.")
+        # Keys sort by player id, then season
+        order = np.argsort(index.keys, kind="stable")
+        keys = index.keys[order]
+        player_ids, starts, lengths = np.unique(keys >> SEASON_BITS, return_index=True, return_counts=True)
+        season_index = np.arange(len(keys)) - np.repeat(starts, lengths)
+        player_row = np.repeat(np.arange(len(player_ids)), lengths)
+        kept = season_index < max_seasons
+
+        width = int(min(lengths.max(initial=0), max_seasons))
+        features = np.zeros((len(player_ids), width, index.features.shape[1]), dtype=np.float32)
+        features[player_row[kept], season_index[kept]] = index.features[order[kept]]
+        seasons = np.zeros((len(player_ids), width), dtype=np.int64)
+        seasons[player_row[kept], season_index[kept]] = keys[kept] & ((1 << SEASON_BITS) - 1)
+        # Labels are "Name (season)"; a career is shown by name
+        names = [index.labels[row].rsplit(" (", 1)[0] for row in order[starts]]
+        return cls(player_ids, names, seasons, features, np.minimum(lengths, width))
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def find(self, player_id):
+        """Returns the position of a player's career. Raises KeyError if the player is unknown."""
+        position = int(np.searchsorted(self.player_ids, player_id))
+        if position == len(self) or self.player_ids[position] != player_id:
+            raise KeyError(player_id)
+        return position
+
+    def top_k(self, position, num_seasons, k):
+        """
+        The `k` careers whose first `num_seasons` seasons are most similar to the first
+        `num_seasons` seasons of the career at `position`. Careers shorter than that are
+        masked out. Returns positions and scores, best first.
+        """
+        if not 1 <= num_seasons <= self.lengths[position]:
+            raise ValueError(f"The player has {self.lengths[position]} seasons to compare.")
+        query = self.features[position, :num_seasons]
+        dots = np.einsum("psf,sf->p", self.features[:, :num_seasons], query)
+        norms = self.prefix_norms[:, num_seasons - 1] * self.prefix_norms[position, num_seasons - 1]
+        scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+        scores[self.lengths < num_seasons] = -np.inf
+        scores[position] = -np.inf
+        return select_top_k(scores, k)
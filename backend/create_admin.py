@@ -1,7 +1,8 @@
 # backend/create_admin.py
 import os
 from database import SessionLocal, engine
-from models import User, Base
+from migrations import upgrade
+from models import User
 from auth.security import get_password_hash
 import logging
 
@@ -11,13 +12,14 @@ logger = logging.getLogger(__name__)
 ADMIN_USERNAME = os.getenv("ADMIN_USER", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 
+
 def create_admin_user():
     if not ADMIN_PASSWORD:
         logger.error("ADMIN_PASSWORD environment variable not set. Cannot create admin user.")
         return
 
     db = SessionLocal()
-    Base.metadata.create_all(bind=engine)   # Ensure the 'users' table exists
+    upgrade(engine)   # Ensure the 'users' table exists
 
     # Check if user already exists
     if db.query(User).filter(User.username == ADMIN_USERNAME).first():
@@ -32,5 +34,6 @@ def create_admin_user():
 
     db.close()
 
+
 if __name__ == "__main__":
     create_admin_user()
@@ -1,7 +1,28 @@
 # backend/database.py
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from metrics import REGISTRY, current_request
+
+# Connection pool settings, used by both engines of every process. An API worker serves
+# requests from the async pool only; its sync engine runs the migrations at startup and is
+# then disposed. On Cloud Run the worst case is instances * workers * (DB_POOL_SIZE +
+# DB_MAX_OVERFLOW), plus whatever the sync pools of running scripts and jobs hold, and it
+# must stay below max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this many seconds are replaced, before proxies or the server drop them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection with a cheap round trip on checkout, so dropped ones are replaced transparently
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
 
 def get_database_url():
     """
@@ -31,16 +52,107 @@ def get_database_url():
     # 3. Default: Fall back to the local Docker database URL.
     return "postgresql://admin:password123@db:5432/wnba_db"
     
+
+# Async drivers used by the API for each database backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def get_async_database_url(database_url):
+    """Swaps the sync driver of a database URL for its async counterpart (asyncpg, aiosqlite)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+# Time each API request waited to get a connection from the pool
+pool_wait_seconds = REGISTRY.histogram(
+    "db_pool_wait_seconds", "Time API requests waited for a pooled database connection."
+).labels()
+# Duration of every SQL statement, on both engines
+query_seconds = REGISTRY.histogram("db_query_seconds", "Duration of SQL statements.").labels()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long every checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
 DATABASE_URL = get_database_url()
 connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+pool_options = dict(
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# The sync engine is used by the scripts (seeding, model building, admin creation)
+# and for creating tables; the API itself talks to the database through async_engine.
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(get_async_database_url(DATABASE_URL), poolclass=TimedQueuePool, **pool_options)
+# expire_on_commit=False keeps loaded attributes usable after commit without a lazy reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    """Dependency to get a database session."""
-    db = SessionLocal()
-    try:
+
+def instrument_queries(sync_engine):
+    """
+    Times every statement run on an engine and adds it to the query count and database
+    time of the request being served, so N+1 lazy loads show up per route.
+    """
+    def start_query(conn, *args):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def end_query(conn, *args):
+        # A statement that failed before reaching the cursor was never started
+        if conn is None or not conn.info.get("query_start"):
+            return
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        query_seconds.observe(elapsed)
+        request = current_request.get()
+        if request is not None:
+            request.db_queries += 1
+            request.db_seconds += elapsed
+
+    event.listen(sync_engine, "before_cursor_execute", start_query)
+    event.listen(sync_engine, "after_cursor_execute", end_query)
+    # Failed statements are counted too, and must not leave their start time behind
+    event.listen(sync_engine, "handle_error", lambda context: end_query(context.connection))
+
+
+instrument_queries(engine)
+instrument_queries(async_engine.sync_engine)
+
+
+def pool_stats():
+    """Live state of the API's connection pool, for sizing instances and pool settings."""
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0), # Negative while fewer than `size` connections exist
+        "timeout_seconds": DB_POOL_TIMEOUT,
+        "wait_seconds": pool_wait_seconds.snapshot(),
+    }
+
+
+REGISTRY.gauge(
+    "db_pool_connections", "Connections of the API's database pool by state.",
+    lambda: {(state,): pool_stats()[state] for state in ("checked_out", "idle", "overflow")}, ("state",),
+)
+
+
+async def get_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
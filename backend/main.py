@@ -1,51 +1,221 @@
 # backend/main.py
+import time
+# Start of this process's cold start: imports, then the lifespan startup, then the first request
+IMPORT_STARTED = time.perf_counter()
+
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+import asyncio
+import gc
+import os
+import re
 from contextlib import asynccontextmanager # Lifespan manager
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, ConfigDict
-from typing import List, Annotated
-
-import joblib
-import pandas as pd
-import numpy as np
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from starlette.routing import Match
+from typing import Dict, List, Annotated, Optional
 
 # Import your SQLAlchemy models and session management
 import models
 import database
+import migrations
+import bulk_stats
+import metrics
+from model_registry import ModelRegistry, ModelVersion
+from season_summary import LEAGUE, STAT_COLUMNS, mark_seasons_stale, refresh_stale_season
+from similarity_index import SIMILARITY_PROFILES
+from response_cache import CachedResponse, ResponseCache, backend_from_env, etag_matches, make_etag
 from database import get_db
 from auth.router import router as auth_router # Import our new auth router
 from auth.router import get_current_user # Import our new dependency
+from auth.security import hashing_pool
+
+# Cached public responses, invalidated whenever players, stats or the model change
+response_cache = ResponseCache(backend_from_env(), ttl=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")))
+# Public GET routes served from the response cache
+CACHEABLE_PATHS = re.compile(
+    r"^/api/(players(/\d+(/seasons/[^/]+/similar|/career/similar)?)?|seasons/[^/]+/(leaders/[^/]+|aggregates))$"
+)
+# Response headers stored along with a cached body
+CACHED_HEADERS = ("content-type", "x-next-after-id", "x-model-version")
+
+# Adds a Server-Timing header with the app, database and model time of every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+# Requests running more SQL statements than this are logged, to surface N+1 query patterns
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "25"))
+# When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+request_seconds = metrics.REGISTRY.histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route.", ("method", "route", "status"),
+)
+request_queries = metrics.REGISTRY.histogram(
+    "http_request_db_queries", "SQL statements run per HTTP request.", ("method", "route"), metrics.QUERY_COUNT_BUCKETS,
+)
+request_db_seconds = metrics.REGISTRY.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route"),
+)
+similarity_seconds = metrics.REGISTRY.histogram(
+    "similarity_query_seconds", "Time to score similarity queries against the model.", ("kind",),
+)
+# Seconds spent in each phase of this process's cold start: import, startup, first_request
+cold_start_seconds = {}
+metrics.REGISTRY.gauge(
+    "app_cold_start_seconds", "Duration of each cold start phase of this process.",
+    lambda: {(phase,): seconds for phase, seconds in cold_start_seconds.items()}, ("phase",),
+)
+
+# How often the model directory is checked for a newly published version (0 disables it)
+MODEL_POLL_SECONDS = float(os.getenv("SIMILARITY_MODEL_POLL_SECONDS", "30"))
+
+
+async def watch_similarity_model(registry: ModelRegistry, interval: float):
+    """Background task that swaps in newly published model versions without a restart."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(registry.refresh)
+        except Exception:
+            logger.exception("Reloading the similarity model failed; keeping the active version.")
+
 
 # --- The Lifespan function now loads the model ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application startup...")
+    startup_started = time.perf_counter()
 
     # Load the ML artifacts and attach them to the app's state
+    app.state.similarity_registry = ModelRegistry(on_change=lambda model: response_cache.invalidate())
     try:
-        app.state.similarity_df = joblib.load("similarity_data.joblib")
-        app.state.similarity_matrix = joblib.load("similarity_matrix.joblib")
-        logger.info("Similarity model artifacts loaded successfully.")
-    except FileNotFoundError:
-        app.state.similarity_df = None
-        app.state.similarity_matrix = None
-        logger.warning("Similarity model artifacts not found. Run build_similarity_model.py.")
-
-    # This part is for the database tables
-    database.Base.metadata.create_all(bind=database.engine)
-
+        if app.state.similarity_registry.refresh() is None:
+            logger.warning("No loadable similarity model was found. Run build_similarity_model.py.")
+    except Exception:
+        # Like the watcher: the API serves everything else, and similarity requests get 503
+        logger.exception("Loading the similarity model failed; similarity requests will get 503.")
+
+    watcher = None
+    if MODEL_POLL_SECONDS > 0:
+        watcher = asyncio.create_task(watch_similarity_model(app.state.similarity_registry, MODEL_POLL_SECONDS))
+
+    # Create missing tables and apply pending schema migrations. The API never uses the
+    # sync engine again, so its connection is closed rather than kept idle in the pool.
+    migrations.upgrade(database.engine)
+    database.engine.dispose()
+
+    # Open a pooled connection and compile the player list queries before the first request
+    async with database.AsyncSessionLocal() as db:
+        await player_payloads(db, select(*PLAYER_COLUMNS).order_by(models.Player.id).limit(1))
+    # Everything allocated so far lives for the whole process. Freezing it keeps the first
+    # full garbage collection from scanning every imported module while a request waits.
+    gc.freeze()
+
+    cold_start_seconds["startup"] = time.perf_counter() - startup_started
+    logger.info(
+        f"Ready to serve after {cold_start_seconds['import']:.2f}s of imports "
+        f"and {cold_start_seconds['startup']:.2f}s of startup."
+    )
     yield # The application runs here
 
+    if watcher is not None:
+        watcher.cancel()
+    # Pooled connections belong to this event loop, so close them with it
+    await database.async_engine.dispose()
     logger.info("Application shutdown.")
 
-app = FastAPI(lifespan=lifespan)
+# orjson encodes responses several times faster than the standard json module
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 
+
+# Registered before CORS so that CORS headers are added to cached responses as well
+@app.middleware("http")
+async def cache_public_responses(request: Request, call_next):
+    """
+    Serves public read endpoints from the response cache and answers conditional
+    requests with 304 Not Modified when the client's ETag is still current.
+    """
+    if request.method != "GET" or not CACHEABLE_PATHS.match(request.url.path):
+        return await call_next(request)
+
+    key = ResponseCache.key(request.url.path, request.query_params)
+    cached = response_cache.get(key)
+    if cached is None:
+        # A write or a model swap while the response is computed makes it stale; it is then not stored
+        generation = response_cache.generation()
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        headers["etag"] = make_etag(body)
+        cached = CachedResponse(response.status_code, body, headers)
+        response_cache.set(key, cached, generation)
+
+    # no-cache lets browsers and the CDN store the response but revalidate it every time
+    if etag_matches(request.headers.get("if-none-match"), cached.headers["etag"]):
+        return Response(status_code=304, headers={"etag": cached.headers["etag"], "cache-control": "no-cache"})
+    return Response(
+        content=cached.body, status_code=cached.status_code, headers={**cached.headers, "cache-control": "no-cache"},
+    )
+
+
+def route_template(request: Request) -> str:
+    """The path template of the route serving a request, e.g. /api/players/{player_id}."""
+    route = request.scope.get("route")
+    if route is None:
+        # Responses served before routing (e.g. from the response cache) are matched here
+        route = next(
+            (candidate for candidate in request.app.router.routes if candidate.matches(request.scope)[0] == Match.FULL), None,
+        )
+    return route.path if route is not None else "unmatched"
+
+
+# Registered after the cache middleware so that responses served from the cache are measured too
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Records the latency, SQL statement count and database time of every request per route,
+    and optionally reports them to the client in a Server-Timing header.
+    """
+    request_metrics = metrics.RequestMetrics()
+    token = metrics.current_request.set(request_metrics)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.current_request.reset(token)
+    elapsed = time.perf_counter() - start
+    cold_start_seconds.setdefault("first_request", elapsed)
+
+    route = route_template(request)
+    request_seconds.labels(request.method, route, str(response.status_code)).observe(elapsed)
+    request_queries.labels(request.method, route).observe(request_metrics.db_queries)
+    request_db_seconds.labels(request.method, route).observe(request_metrics.db_seconds)
+    if request_metrics.db_queries > QUERY_COUNT_WARNING:
+        logger.warning(
+            f"{request.method} {route} ran {request_metrics.db_queries} SQL statements "
+            f"({request_metrics.db_seconds * 1e3:.1f} ms); look for N+1 loads."
+        )
+
+    if SERVER_TIMING:
+        timings = [
+            f"app;dur={elapsed * 1e3:.2f}",
+            f'db;dur={request_metrics.db_seconds * 1e3:.2f};desc="{request_metrics.db_queries} queries"',
+        ]
+        timings += [f"{span};dur={seconds * 1e3:.2f}" for span, seconds in request_metrics.spans.items()]
+        response.headers["Server-Timing"] = ", ".join(timings)
+    return response
+
 origins = [
     "http://localhost:3000",
     "https://wnba-frontend-service-776933261932.us-west1.run.app"
@@ -56,11 +226,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Model-Version", "X-Next-After-Id", "ETag", "Server-Timing"],
 )
 
+
 # --- Pydantic Schemas ---
 class PlayerStatBase(BaseModel):
     season: str
+    team: Optional[str] = None # Defaults to the player's current team when a line is created
     points_per_game: float
     rebounds_per_game: float
     assists_per_game: float
@@ -72,138 +245,665 @@ class PlayerStatBase(BaseModel):
     blocks_per_game: float
     player_efficiency_rating: float
 
+
 class PlayerStatCreate(PlayerStatBase):
     pass
 
+
 class PlayerStat(PlayerStatBase):
     id: int
     player_id: int
     model_config = ConfigDict(from_attributes=True)
 
+
 class PlayerBase(BaseModel):
     first_name: str
     last_name: str
     team: str
 
+
 class PlayerCreate(PlayerBase):
     pass
 
+
 class Player(PlayerBase):
     id: int
     stats: List[PlayerStat] = []
     model_config = ConfigDict(from_attributes=True)
 
+
+class StatLeaderOut(BaseModel):
+    rank: int
+    percentile: float
+    value: float
+    player_id: int
+    first_name: str
+    last_name: str
+    team: str
+
+
+class SeasonStatSummaryOut(BaseModel):
+    season: str
+    team: str
+    stat: str
+    players: int
+    mean: float
+    minimum: float
+    maximum: float
+    p10: float
+    p25: float
+    median: float
+    p75: float
+    p90: float
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PlayerStatBulkRow(PlayerStatCreate):
+    player_id: int
+
+
+class BulkStatResult(BaseModel):
+    row: int # Position of the stat line in the request
+    status: str # "created", "updated" or "error"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkStatsResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkStatResult]
+
+
 class UserOut(BaseModel):
     id: int
     username: str
     model_config = ConfigDict(from_attributes=True)
 
+
 # ---- PROTECTED API ENDPOINTS ----
 # Endpoint to CREATE a new player
 @app.post("/api/players", response_model=Player)
-def create_player(player: PlayerCreate, current_user: Annotated[models.User, Depends(get_current_user)], db: Session = Depends(get_db)):
-    new_player = models.Player(**player.model_dump())
+async def create_player(
+    player: PlayerCreate, current_user: Annotated[models.User, Depends(get_current_user)], db: AsyncSession = Depends(get_db),
+):
+    new_player = models.Player(**player.model_dump(), stats=[]) # A new player has no stats to load
     db.add(new_player)
-    db.commit()
-    db.refresh(new_player)
+    await db.commit()
+    response_cache.invalidate()
     return new_player
 
+
+async def get_player_with_stats(db: AsyncSession, player_id: int) -> Optional[models.Player]:
+    """Loads a player and their stats up front; async sessions cannot lazy-load them later."""
+    result = await db.execute(
+        select(models.Player).options(selectinload(models.Player.stats)).where(models.Player.id == player_id)
+    )
+    return result.scalar_one_or_none()
+
+
 # Endpoint to UPDATE a player 
 @app.put("/api/players/{player_id}", response_model=Player)
-def update_player(player_id: int, player_update: PlayerCreate, current_user: Annotated[models.User, Depends(get_current_user)], db: Session = Depends(get_db)):
-    player_to_update = db.query(models.Player).filter(models.Player.id == player_id).first()
+async def update_player(
+    player_id: int,
+    player_update: PlayerCreate,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    player_to_update = await get_player_with_stats(db, player_id)
     if player_to_update is None: raise HTTPException(status_code=404, detail="Player not found")
 
-    # Update the player's attributes
+    # Update the player's attributes; past stat lines keep the team of their season
     for key, value in player_update.model_dump().items():
         setattr(player_to_update, key, value)
-
-    db.commit()
-    db.refresh(player_to_update)
+    await db.commit()
+    response_cache.invalidate()
     return player_to_update
 
+
 # Endpoint to DELETE a player
 @app.delete("/api/players/{player_id}")
-def delete_player(player_id: int, current_user: Annotated[models.User, Depends(get_current_user)], db: Session = Depends(get_db)):
-    player_to_delete = db.query(models.Player).filter(models.Player.id == player_id).first()
+async def delete_player(
+    player_id: int, current_user: Annotated[models.User, Depends(get_current_user)], db: AsyncSession = Depends(get_db),
+):
+    # The stats are loaded so the delete-orphan cascade can remove them
+    player_to_delete = await get_player_with_stats(db, player_id)
     if player_to_delete is None: raise HTTPException(status_code=404, detail="Player not found")
-    db.delete(player_to_delete)
-    db.commit()
+    seasons = [stat.season for stat in player_to_delete.stats]
+    await db.delete(player_to_delete)
+    await db.run_sync(lambda session: mark_seasons_stale(session, seasons))
+    await db.commit()
+    response_cache.invalidate()
     return {"message": "Player deleted successfully"}  
     
+
+def is_duplicate_season(error: IntegrityError) -> bool:
+    """Whether a write failed on the one-line-per-season index (PostgreSQL names it, SQLite lists its columns)."""
+    message = str(error.orig)
+    return "uq_player_stats_player_season" in message or "player_stats.player_id, player_stats.season" in message
+
+
 @app.post("/api/players/{player_id}/stats", response_model=PlayerStat)
-def create_stats_for_player(player_id: int, stat: PlayerStatCreate, current_user: Annotated[models.User, Depends(get_current_user)], db: Session = Depends(get_db)):
-    db_player = db.query(models.Player).filter(models.Player.id == player_id).first()
+async def create_stats_for_player(
+    player_id: int,
+    stat: PlayerStatCreate,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    db_player = await db.get(models.Player, player_id)
     if db_player is None: raise HTTPException(status_code=404, detail="Player not found")
-    db_stat = models.PlayerStat(**stat.model_dump(), player_id=player_id)
+    duplicate = HTTPException(status_code=409, detail=f"Player already has stats for the {stat.season} season")
+    existing = await db.scalar(
+        select(models.PlayerStat.id).where(models.PlayerStat.player_id == player_id, models.PlayerStat.season == stat.season)
+    )
+    if existing is not None: raise duplicate
+    db_stat = models.PlayerStat(**{**stat.model_dump(), "team": stat.team or db_player.team}, player_id=player_id)
     db.add(db_stat)
-    db.commit()
-    db.refresh(db_stat)
+    try:
+        # The season's leaderboards and aggregates are rebuilt by the next read
+        await db.run_sync(lambda session: mark_seasons_stale(session, [db_stat.season]))
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # Only a concurrent insert of the same season is a conflict; anything else is a server error
+        if not is_duplicate_season(e): raise
+        raise duplicate
+    response_cache.invalidate()
     return db_stat
 
+
+async def _read_bulk_body(request: Request) -> bytes:
+    """Reads a bulk request body, rejecting it with 413 once it exceeds bulk_stats.MAX_BODY_BYTES."""
+    too_large = HTTPException(status_code=413, detail=f"Bulk request bodies are limited to {bulk_stats.MAX_BODY_BYTES} bytes.")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > bulk_stats.MAX_BODY_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > bulk_stats.MAX_BODY_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+def _validate_bulk_rows(body: bytes, content_type: str):
+    """
+    Parses and validates the rows of a bulk request body.
+    Returns ({position: error result}, [(position, values)] of the valid rows); raises ValueError
+    if the body as a whole can't be read.
+    """
+    raw_rows = bulk_stats.parse_rows(body, content_type)
+    # Validate everything in one pass before touching the database
+    results = {}
+    valid_rows, seen = [], {}
+    for position, raw in enumerate(raw_rows):
+        if isinstance(raw, Exception):
+            results[position] = ("error", None, f"Invalid JSON: {raw}")
+            continue
+        try:
+            values = PlayerStatBulkRow.model_validate(raw).model_dump()
+        except ValidationError as e:
+            results[position] = ("error", None, "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in e.errors()
+            ))
+            continue
+        key = (values["player_id"], values["season"])
+        if key in seen:
+            results[position] = ("error", None, f"Duplicates row {seen[key]} (same player_id and season)")
+            continue
+        seen[key] = position
+        valid_rows.append((position, values))
+
+    return results, valid_rows
+
+
+@app.post("/api/stats:bulk", response_model=BulkStatsResponse)
+async def create_stats_bulk(
+    request: Request, current_user: Annotated[models.User, Depends(get_current_user)], db: AsyncSession = Depends(get_db),
+):
+    """
+    Creates or updates many stat lines at once, matched by (player_id, season). The body is
+    a JSON array of stat lines with a player_id, or NDJSON with Content-Type application/x-ndjson.
+    Every line gets its own result; invalid lines are reported without failing the others.
+    """
+    body = await _read_bulk_body(request)
+    try:
+        # Parsing and validating thousands of rows is CPU-bound; keep it off the event loop
+        results, valid_rows = await run_in_threadpool(_validate_bulk_rows, body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if valid_rows:
+        results.update(await db.run_sync(lambda session: bulk_stats.write_stat_rows(session, valid_rows)))
+        response_cache.invalidate()
+
+    items = [
+        BulkStatResult(row=position, status=status, id=stat_id, detail=detail)
+        for position, (status, stat_id, detail) in sorted(results.items())
+    ]
+    counts = {status: sum(item.status == status for item in items) for status in ("created", "updated", "error")}
+    return BulkStatsResponse(created=counts["created"], updated=counts["updated"], failed=counts["error"], results=items)
+
+
 @app.get("/users", response_model=List[UserOut])
-def read_users(current_user: Annotated[models.User, Depends(get_current_user)], db: Session = Depends(get_db)):
+async def read_users(current_user: Annotated[models.User, Depends(get_current_user)], db: AsyncSession = Depends(get_db)):
     """
     Retrieves a list of all users.
     This is a protected endpoint that requires authentication.
     The `response_model` ensures that only the fields from `UserOut` (id, username)
     are returned, protecting the hashed password.
     """
-    users = db.query(models.User).all()
+    users = (await db.scalars(select(models.User))).all()
     return users
 
+
+@app.get("/api/admin/metrics")
+def read_runtime_metrics(current_user: Annotated[models.User, Depends(get_current_user)]):
+    """Live utilization of the app's worker pools, for sizing instances."""
+    return {"password_hashing": hashing_pool.stats(), "database_pool": database.pool_stats()}
+
+
+@app.post("/api/admin/similarity/reload")
+async def reload_similarity_model(request: Request, current_user: Annotated[models.User, Depends(get_current_user)]):
+    """
+    Loads the most recently published similarity model in a worker thread and swaps it in.
+    Requests already in flight finish on the version they started with.
+    """
+    registry = request.app.state.similarity_registry
+    previous = registry.active
+    model = await asyncio.to_thread(registry.refresh)
+    if model is None:
+        raise HTTPException(status_code=503, detail="No similarity model has been published.")
+    return {"version": model.version, "previous_version": previous.version if previous else None}
+
+
+@app.get("/metrics", include_in_schema=False)
+def read_prometheus_metrics(request: Request):
+    """Request, database, model and pool metrics in the Prometheus text format."""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
 # ---- PUBLIC API ENDPOINTS ----
 @app.get("/api")
 def read_root():
     return {"message": "WNBA Analytics API is running!"}
 
-# Endpoint to READ all players
-@app.get("/api/players", response_model=List[Player])
-def get_players(db: Session = Depends(get_db)):
-    players = db.query(models.Player).all()
+
+# Page size limits for the player list
+DEFAULT_PLAYERS_PAGE_SIZE = 100
+MAX_PLAYERS_PAGE_SIZE = 500
+# Response header carrying the `after_id` cursor of the next page, if there is one
+NEXT_PAGE_HEADER = "X-Next-After-Id"
+
+# Endpoint to READ players, one keyset-paginated page at a time
+# Read-only list endpoints encode plain dicts built from row tuples and return them as the
+# response directly, skipping ORM object construction and response_model re-validation.
+# The columns are the schema's fields, so the output matches the documented model.
+PLAYER_COLUMNS = [getattr(models.Player, field) for field in PlayerBase.model_fields] + [models.Player.id]
+STAT_FIELDS = list(PlayerStat.model_fields)
+
+
+async def player_payloads(db: AsyncSession, query) -> List[dict]:
+    """
+    Runs a query selecting PLAYER_COLUMNS and returns the players as response dicts,
+    with their stats loaded by one extra SELECT ... IN instead of one per player.
+    """
+    fields = [column.key for column in PLAYER_COLUMNS]
+    players = [dict(zip(fields, row), stats=[]) for row in await db.execute(query)]
+    if players:
+        by_id = {player["id"]: player["stats"] for player in players}
+        stats = await db.execute(
+            select(*[getattr(models.PlayerStat, field) for field in STAT_FIELDS])
+            .where(models.PlayerStat.player_id.in_(by_id)).order_by(models.PlayerStat.id)
+        )
+        for row in stats:
+            stat = dict(zip(STAT_FIELDS, row))
+            by_id[stat["player_id"]].append(stat)
     return players
 
+
+def name_prefix(column, prefix: str):
+    """
+    `column` starts with `prefix`, as LIKE 'prefix%' with wildcards escaped. Answered from the
+    name prefix indexes; it ignores case on SQLite and respects it on PostgreSQL.
+    """
+    # One bound pattern: databases only use an index for LIKE when the pattern is a single value
+    escaped = prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return column.like(escaped + "%", escape="/")
+
+
+@app.get("/api/players", response_model=List[Player])
+async def get_players(
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PLAYERS_PAGE_SIZE, ge=1, le=MAX_PLAYERS_PAGE_SIZE),
+    team: Optional[str] = None,
+    season: Optional[str] = None,
+    name: Optional[str] = Query(None, description="Prefix of the first or last name"),
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(*PLAYER_COLUMNS)
+    if after_id is not None:
+        query = query.where(models.Player.id > after_id)
+    if team is not None:
+        query = query.where(models.Player.team == team)
+    if season is not None:
+        query = query.where(models.Player.stats.any(models.PlayerStat.season == season))
+    if name:
+        query = query.where(or_(name_prefix(models.Player.first_name, name), name_prefix(models.Player.last_name, name)))
+
+    # Fetch one extra row to learn whether another page follows
+    players = await player_payloads(db, query.order_by(models.Player.id).limit(limit + 1))
+    headers = {}
+    if len(players) > limit:
+        players = players[:limit]
+        headers[NEXT_PAGE_HEADER] = str(players[-1]["id"])
+    return ORJSONResponse(players, headers=headers)
+
+
 @app.get("/api/players/{player_id}", response_model=Player)
-def get_player(player_id: int, db: Session = Depends(get_db)):
-    player = db.query(models.Player).filter(models.Player.id == player_id).first()
-    if player is None: raise HTTPException(status_code=404, detail="Player not found")
-    return player
+async def get_player(player_id: int, db: AsyncSession = Depends(get_db)):
+    payload = await player_payloads(db, select(*PLAYER_COLUMNS).where(models.Player.id == player_id))
+    if not payload: raise HTTPException(status_code=404, detail="Player not found")
+    return ORJSONResponse(payload[0])
+
+# Upper bound on the `limit` query parameter of the leaderboard endpoint
+MAX_LEADERS = 100
+
+
+def check_stat(stat: str):
+    if stat not in STAT_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown stat. Choose one of: {', '.join(STAT_COLUMNS)}")
+
+
+async def refresh_if_stale(db: AsyncSession, season: str):
+    """Rebuilds the season's summaries first if its stat lines changed since the last rebuild."""
+    if await db.run_sync(lambda session: refresh_stale_season(session, season)):
+        await db.commit()
+
+
+@app.get("/api/seasons/{season}/leaders/{stat}", response_model=List[StatLeaderOut])
+async def get_stat_leaders(
+    season: str,
+    stat: str,
+    team: Optional[str] = Query(None, description="Only rank players of this team"),
+    limit: int = Query(10, ge=1, le=MAX_LEADERS),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Top players of a season by one stat column, e.g. /api/seasons/2024/leaders/player_efficiency_rating.
+    Ranks and percentiles are league-wide and read from the precomputed stat_leaders table.
+    """
+    check_stat(stat)
+    await refresh_if_stale(db, season)
+    leader = models.StatLeader
+    query = (
+        select(
+            leader.rank, leader.percentile, leader.value, leader.player_id,
+            models.Player.first_name, models.Player.last_name, leader.team,
+        )
+        .join(models.Player, models.Player.id == leader.player_id)
+        .where(leader.season == season, leader.stat == stat)
+    )
+    if team is not None:
+        query = query.where(leader.team == team)
+    rows = await db.execute(query.order_by(leader.rank).limit(limit))
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+@app.get("/api/seasons/{season}/aggregates", response_model=List[SeasonStatSummaryOut])
+async def get_season_aggregates(
+    season: str,
+    team: Optional[str] = Query(None, description=f"A team, or {LEAGUE} for league-wide rows; all rows if omitted"),
+    stat: Optional[str] = Query(None, description="Only this stat column"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Mean, range and percentiles of each stat column for a season, per team and league-wide."""
+    fields = list(SeasonStatSummaryOut.model_fields)
+    query = select(*[getattr(models.SeasonStatSummary, field) for field in fields])
+    query = query.where(models.SeasonStatSummary.season == season)
+    if stat is not None:
+        check_stat(stat)
+        query = query.where(models.SeasonStatSummary.stat == stat)
+    if team is not None:
+        query = query.where(models.SeasonStatSummary.team == team)
+    query = query.order_by(models.SeasonStatSummary.stat, models.SeasonStatSummary.team)
+    await refresh_if_stale(db, season)
+    return ORJSONResponse([dict(zip(fields, row)) for row in await db.execute(query)])
+
 
 # A Pydantic schema for the similarity response
 class SimilarPlayer(BaseModel):
-    player_season_id: str
+    player_id: int
+    season: str
+    player_season_id: str # Display label, "First Last (season)"
     similarity_score: float
 
-# The Similarity API Endpoint
-@app.get("/api/players/{player_id}/seasons/{season}/similar", response_model=List[SimilarPlayer])
-def get_similar_players(player_id: int, season: str, request: Request, db: Session = Depends(get_db)):
-    # Get the loaded models from the application state
-    similarity_df = request.app.state.similarity_df
-    similarity_matrix = request.app.state.similarity_matrix
 
-    if similarity_df is None:
+# Upper bound on the `k` query parameter of the similarity endpoints
+MAX_SIMILAR_PLAYERS = 50
+# Upper bound on the number of player-seasons resolved by one batch request
+MAX_BATCH_QUERIES = 1000
+
+
+class SimilarityQuery(BaseModel):
+    player_id: int
+    season: str
+
+
+class SimilarBatchRequest(BaseModel):
+    queries: List[SimilarityQuery] = Field(default_factory=list, max_length=MAX_BATCH_QUERIES)
+    season: Optional[str] = None
+    team: Optional[str] = None
+    k: int = Field(5, ge=1, le=MAX_SIMILAR_PLAYERS)
+    profile: Optional[str] = None
+    weights: Optional[Dict[str, float]] = None
+
+
+class SimilarBatchResult(BaseModel):
+    player_id: int
+    season: str
+    player_season_id: Optional[str] = None
+    similar: List[SimilarPlayer] = []
+    detail: Optional[str] = None
+
+
+# Response header reporting which model version answered a similarity request
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+
+def get_similarity_model(request: Request, response: Response) -> ModelVersion:
+    """
+    Pins the active model version for the duration of one request, so a concurrent
+    reload cannot change the model halfway through.
+    """
+    model = request.app.state.similarity_registry.active
+    if model is None:
         raise HTTPException(status_code=503, detail="Similarity model is not available.")
+    response.headers[MODEL_VERSION_HEADER] = model.version
+    return model
+
+
+def parse_weights(weights: str) -> Dict[str, float]:
+    """Parses the `weights` query parameter, e.g. "TRB:3,BLK:2"."""
+    parsed = {}
+    for item in weights.split(","):
+        name, _, value = item.rpartition(":")
+        try:
+            parsed[name.strip()] = float(value)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid weight {item!r}; use FEATURE:WEIGHT pairs.")
+    return parsed
+
+
+def feature_weights(similarity_index, profile: Optional[str], weights: Optional[Dict[str, float]]):
+    """The weight vector for a request's profile or explicit weights, or None for plain similarity."""
+    if profile is not None and weights is not None:
+        raise HTTPException(status_code=422, detail="Pass either a profile or weights, not both.")
+    if profile is not None:
+        if profile not in SIMILARITY_PROFILES:
+            raise HTTPException(status_code=422, detail=f"Unknown profile. Choose one of: {', '.join(SIMILARITY_PROFILES)}")
+        # Profiles only weight the features this model was built with
+        available = set(similarity_index.feature_names or [])
+        weights = {name: weight for name, weight in SIMILARITY_PROFILES[profile].items() if name in available}
+    if weights is None:
+        return None
+    try:
+        return similarity_index.feature_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 
-    player = db.query(models.Player).filter(models.Player.id == player_id).first()
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
+def similar_players(similarity_index, rows, scores):
+    """Response items for the given model rows and their similarity scores."""
+    results = []
+    for row, score in zip(rows, scores):
+        player_id, season = similarity_index.player_season(row)
+        results.append({
+            "player_id": player_id, "season": season,
+            "player_season_id": similarity_index.labels[row], "similarity_score": score,
+        })
+    return results
 
-    player_season_id = f"{player.first_name} {player.last_name} ({season})"
+
+# The Similarity API Endpoint
+@app.get("/api/players/{player_id}/seasons/{season}/similar", response_model=List[SimilarPlayer])
+async def get_similar_players(
+    player_id: int,
+    season: str,
+    model: Annotated[ModelVersion, Depends(get_similarity_model)],
+    k: int = Query(5, ge=1, le=MAX_SIMILAR_PLAYERS),
+    profile: Optional[str] = Query(None, description=f"Weight features for one role: {', '.join(SIMILARITY_PROFILES)}"),
+    weights: Optional[str] = Query(None, description="Custom feature weights, e.g. TRB:3,BLK:2; other features are ignored"),
+):
+    """
+    Answered from the in-memory model alone; player-seasons are looked up by (player_id, season).
+    With a profile or weights the comps are ranked by weighted cosine similarity.
+    """
+    similarity_index = model.index
+    weight_vector = feature_weights(similarity_index, profile, parse_weights(weights) if weights else None)
 
     try:
-        target_idx = similarity_df.index.get_loc(player_season_id)
+        target_idx = similarity_index.find(player_id, season)
     except KeyError:
-        raise HTTPException(status_code=404, detail=f"Stats for {player_season_id} not found in model.")
+        raise HTTPException(status_code=404, detail=f"Stats for player {player_id} in {season} not found in model.")
+
+    with metrics.timed(similarity_seconds.labels("single" if weight_vector is None else "weighted"), span="similarity"):
+        top_similar_indices, top_similar_scores = similarity_index.top_k(target_idx, k, weight_vector)
+    return similar_players(similarity_index, top_similar_indices, top_similar_scores.tolist())
+
+
+class SimilarCareer(BaseModel):
+    player_id: int
+    player_name: str
+    seasons: List[str] # The seasons that were compared, in career order
+    similarity_score: float
+
 
-    similarity_scores = list(enumerate(similarity_matrix[target_idx]))
-    sorted_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
-    top_similar_indices = [i[0] for i in sorted_scores[1:6]]
-    top_similar_scores = [i[1] for i in sorted_scores[1:6]]
-    similar_players_names = similarity_df.index[top_similar_indices].tolist()
+@app.get("/api/players/{player_id}/career/similar", response_model=List[SimilarCareer])
+async def get_similar_careers(
+    player_id: int,
+    model: Annotated[ModelVersion, Depends(get_similarity_model)],
+    seasons: Optional[int] = Query(
+        None, ge=1, description="Compare the first N seasons of each career; all of this player's seasons if omitted",
+    ),
+    k: int = Query(5, ge=1, le=MAX_SIMILAR_PLAYERS),
+):
+    """
+    Players whose first N seasons look most like this player's first N seasons, aligned by
+    season index. Only careers with at least N seasons are candidates.
+    """
+    careers = model.careers
+    if careers is None:
+        raise HTTPException(status_code=503, detail="Career similarity needs a model built with per-feature data.")
+    try:
+        position = careers.find(player_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found in model.")
 
-    response = [
-        {"player_season_id": name, "similarity_score": score}
-        for name, score in zip(similar_players_names, top_similar_scores)
+    num_seasons = seasons or int(careers.lengths[position])
+    try:
+        with metrics.timed(similarity_seconds.labels("career"), span="similarity"):
+            top, scores = careers.top_k(position, num_seasons, k)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return [
+        {
+            "player_id": int(careers.player_ids[match]), "player_name": careers.names[match],
+            "seasons": [str(season) for season in careers.seasons[match, :num_seasons]], "similarity_score": score,
+        }
+        for match, score in zip(top, scores.tolist())
     ]
 
-    return response
+
+@app.post("/api/similar:batch", response_model=List[SimilarBatchResult])
+async def get_similar_players_batch(
+    batch: SimilarBatchRequest,
+    model: Annotated[ModelVersion, Depends(get_similarity_model)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Returns the top-k comps for many player-seasons at once, either an explicit list of
+    (player_id, season) pairs or every player-season matching a season/team filter.
+    Explicit lists are resolved in memory; all queries are scored together with one
+    matrix product per block.
+    """
+    similarity_index = model.index
+    weight_vector = feature_weights(similarity_index, batch.profile, batch.weights)
+
+    if batch.queries:
+        pairs = [(query.player_id, query.season) for query in batch.queries]
+    elif batch.season is not None or batch.team is not None:
+        # Only the filter needs the database, since teams are not part of the model.
+        # A team means its roster of that season, not the players on it today.
+        query = select(models.PlayerStat.player_id, models.PlayerStat.season)
+        if batch.season is not None:
+            query = query.where(models.PlayerStat.season == batch.season)
+        if batch.team is not None:
+            query = query.where(models.PlayerStat.team == batch.team)
+        # One extra row tells a filter that is too broad apart from one that fits exactly
+        query = query.order_by(models.PlayerStat.player_id, models.PlayerStat.season).limit(MAX_BATCH_QUERIES + 1)
+        rows = await db.execute(query)
+        pairs = [(player_id, season) for player_id, season in rows]
+        if len(pairs) > MAX_BATCH_QUERIES:
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    f"The filter matches more than {MAX_BATCH_QUERIES} player-seasons. "
+                    "Narrow it, or send the queries in several requests."
+                ),
+            )
+    else:
+        raise HTTPException(status_code=422, detail="Provide either queries or a season/team filter.")
+
+    # Non-numeric seasons can't be in the model; they are looked up as season 0, which never matches
+    model_rows = similarity_index.find_rows(
+        [player_id for player_id, _ in pairs], [int(season) if season.isdigit() else 0 for _, season in pairs]
+    ).tolist()
+
+    results = []
+    found = [] # (result, model row) for every query present in the model
+    for (player_id, season), row in zip(pairs, model_rows):
+        result = {"player_id": player_id, "season": season, "similar": []}
+        results.append(result)
+        if row < 0:
+            result["detail"] = f"Stats for player {player_id} in {season} not found in model."
+            continue
+        result["player_season_id"] = similarity_index.labels[row]
+        found.append((result, row))
+
+    if found:
+        # Large batches are CPU-bound, so score them off the event loop
+        with metrics.timed(similarity_seconds.labels("batch"), span="similarity"):
+            top, top_scores = await run_in_threadpool(
+                similarity_index.top_k_batch, [row for _, row in found], batch.k, weight_vector,
+            )
+        for (result, _), neighbours, scores in zip(found, top, top_scores.tolist()):
+            result["similar"] = similar_players(similarity_index, neighbours, scores)
+
+    return results
+
+# Measured last, once every route and model is defined
+cold_start_seconds["import"] = time.perf_counter() - IMPORT_STARTED
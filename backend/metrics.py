@@ -0,0 +1,154 @@
+# backend/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Upper bounds, in seconds, of the default latency buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the buckets counting database queries per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Thread-safe histogram of observed durations with cumulative, Prometheus-style buckets."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1) # The last slot counts values above every bound
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self):
+        """Returns the count, the sum and the cumulative count of observations <= each bound."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        buckets, running = {}, 0
+        for bound, count in zip([str(bound) for bound in self.buckets] + ["+Inf"], counts):
+            running += count
+            buckets[bound] = running
+        return {"count": running, "sum": total, "buckets": buckets}
+
+
+def _label_pairs(names, values):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return [f'{name}="{value}"' for name, value in zip(names, escaped)]
+
+
+def _format_labels(pairs):
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class HistogramFamily:
+    """A named histogram with one child Histogram per combination of label values."""
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        """The child for these label values, in the order of `label_names`; created on first use."""
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} takes the labels {', '.join(self.label_names) or '(none)'}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = Histogram(self.buckets)
+            return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            pairs = _label_pairs(self.label_names, values)
+            snapshot = child.snapshot()
+            for bound, count in snapshot["buckets"].items():
+                bucket_labels = _format_labels(pairs + _label_pairs(["le"], [bound]))
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {snapshot['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {snapshot['count']}")
+        return lines
+
+
+class GaugeFamily:
+    """A gauge whose values are read when rendered, from a callback returning {label values: value}."""
+
+    def __init__(self, name, documentation, callback, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.label_names = tuple(label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for values, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(_label_pairs(self.label_names, values))} {value}")
+        return lines
+
+
+class Registry:
+    """The metrics exposed by GET /metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._families = {}
+
+    def _add(self, family):
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def histogram(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS) -> HistogramFamily:
+        return self._add(HistogramFamily(name, documentation, label_names, buckets))
+
+    def gauge(self, name, documentation, callback, label_names=()) -> GaugeFamily:
+        return self._add(GaugeFamily(name, documentation, callback, label_names))
+
+    def render(self) -> str:
+        return "\n".join(line for family in self._families.values() for line in family.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class RequestMetrics:
+    """Work done while serving one request: database queries and named timing spans."""
+    __slots__ = ("db_queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.spans = {} # Span name -> seconds
+
+
+# The metrics of the request being served; set by the metrics middleware and
+# inherited by the tasks, threads and greenlets that work on the request
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+
+@contextmanager
+def timed(histogram: Histogram, span: Optional[str] = None):
+    """Observes the duration of the block in `histogram` and adds it to the current request's `span`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed)
+        request = current_request.get()
+        if span is not None and request is not None:
+            request.spans[span] = request.spans.get(span, 0.0) + elapsed
@@ -0,0 +1,164 @@
+# backend/migrations.py
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, collate, delete, func, inspect, select, text, update,
+)
+
+import models
+from database import Base
+
+logger = logging.getLogger(__name__)
+
+# Records which migrations have been applied to a database
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+# Name of the PostgreSQL advisory lock that lets one process at a time upgrade the database
+UPGRADE_LOCK = "wnba:schema_migrations"
+
+# The tables as migration 0001 found them, with the indexes it adds. Frozen here so that
+# later changes to the models (e.g. indexes on columns a later migration adds) don't change it.
+_metadata_0001 = MetaData()
+_players_0001 = Table(
+    "players", _metadata_0001,
+    Column("id", Integer, primary_key=True),
+    Column("team", String),
+    Index("ix_players_team_id", "team", "id"),
+)
+_player_stats_0001 = Table(
+    "player_stats", _metadata_0001,
+    Column("id", Integer, primary_key=True),
+    Column("player_id", Integer),
+    Column("season", String),
+    Column("games_played", Integer),
+    Index("uq_player_stats_player_season", "player_id", "season", unique=True),
+    Index("ix_player_stats_season_player", "season", "player_id"),
+)
+
+
+def _drop_duplicate_player_stats(conn):
+    # Older seeders stored every row of a traded player, in file order. The season total
+    # ('TOT') has the most games, so of every (player_id, season) pair the line with the
+    # most games is kept, and the newest one among equals.
+    stats = _player_stats_0001.c
+    ranked = select(
+        stats.id,
+        func.row_number().over(
+            partition_by=(stats.player_id, stats.season),
+            order_by=(func.coalesce(stats.games_played, -1).desc(), stats.id.desc()),
+        ).label("position"),
+    ).subquery()
+    keep = select(ranked.c.id).where(ranked.c.position == 1)
+    result = conn.execute(delete(_player_stats_0001).where(stats.id.not_in(keep)))
+    if result.rowcount:
+        logger.warning(f"Removed {result.rowcount} duplicate player_stats rows before adding the unique index.")
+
+
+def _player_stat_indexes(conn):
+    """Composite and foreign key indexes for player/season lookups, unique (player_id, season)."""
+    _drop_duplicate_player_stats(conn)
+    for table in (_players_0001, _player_stats_0001):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _player_stat_team(conn):
+    """
+    Season team on every stat line, backfilled from the player's current team.
+
+    Existing databases hold no record of past teams, so lines of a season a player spent
+    elsewhere get the wrong team here, and season summaries built from them group the player
+    under that team. Re-run seed_database.py to set the team from the source data of every
+    season it covers; lines of seasons without source data keep the backfilled team until
+    corrected (e.g. through POST /api/stats:bulk with a team).
+    """
+    if "team" not in {column["name"] for column in inspect(conn).get_columns("player_stats")}:
+        conn.execute(text("ALTER TABLE player_stats ADD COLUMN team VARCHAR"))
+    player_team = select(models.Player.team).where(models.Player.id == models.PlayerStat.player_id).scalar_subquery()
+    conn.execute(update(models.PlayerStat).where(models.PlayerStat.team.is_(None)).values(team=player_team))
+
+
+def _player_stat_team_index(conn):
+    """Index for a team's roster by season, on the column 0002 added."""
+    player_stats = Table(
+        "player_stats", MetaData(),
+        Column("player_id", Integer), Column("season", String), Column("team", String),
+        Index("ix_player_stats_team_season", "team", "season", "player_id"),
+    )
+    for index in player_stats.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _player_name_prefix_indexes(conn):
+    """Indexes name prefix searches (LIKE 'prefix%') can use: pattern ops on PostgreSQL, NOCASE on SQLite."""
+    players = Table("players", MetaData(), Column("first_name", String), Column("last_name", String))
+    for name in ("first_name", "last_name"):
+        if conn.dialect.name == "postgresql":
+            index = Index(f"ix_players_{name}_pattern", players.c[name], postgresql_ops={name: "text_pattern_ops"})
+        elif conn.dialect.name == "sqlite":
+            index = Index(f"ix_players_{name}_nocase", collate(players.c[name], "NOCASE"))
+        else:
+            continue
+        index.create(conn, checkfirst=True)
+
+
+# Applied in order, each exactly once per database. Never edit or reorder released entries.
+MIGRATIONS = [
+    ("0001_player_stat_indexes", _player_stat_indexes),
+    ("0002_player_stat_team", _player_stat_team),
+    ("0003_player_stat_team_index", _player_stat_team_index),
+    ("0004_player_name_prefix_indexes", _player_name_prefix_indexes),
+]
+
+
+@contextmanager
+def _upgrade_lock(engine):
+    """
+    On PostgreSQL, holds a session advisory lock for the whole upgrade, so that workers
+    starting together wait for each other instead of racing on the same DDL. SQLite
+    needs no lock: it is never shared between instances.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(select(func.pg_advisory_lock(func.hashtext(UPGRADE_LOCK))))
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(func.hashtext(UPGRADE_LOCK))))
+            conn.commit()
+
+
+def upgrade(engine):
+    """
+    Brings a database up to the current schema. Missing tables are created from the
+    models (with their indexes), then every pending migration runs in its own
+    transaction so that tables created by older versions receive later changes too.
+    Returns the versions that were applied.
+    """
+    with _upgrade_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        schema_migrations.create(engine, checkfirst=True)
+
+        # Read under the lock, so a worker that waited sees what the previous one applied
+        with engine.connect() as conn:
+            applied = set(conn.scalars(select(schema_migrations.c.version)))
+
+        newly_applied = []
+        for version, migration in MIGRATIONS:
+            if version in applied:
+                continue
+            with engine.begin() as conn:
+                migration(conn)
+                conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.now(timezone.utc)))
+            logger.info(f"Applied schema migration {version}.")
+            newly_applied.append(version)
+    return newly_applied
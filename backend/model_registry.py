@@ -0,0 +1,105 @@
+# backend/model_registry.py
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from career_index import CareerIndex
+from metrics import REGISTRY, timed
+from similarity_index import IncompatibleModelError, SimilarityIndex, INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+# File inside the model directory naming the version that should be served
+CURRENT_FILE = "CURRENT"
+# Number of published versions kept on disk, including the current one
+KEEP_VERSIONS = 3
+
+# Time to load a published version and build its career index
+model_load_seconds = REGISTRY.histogram("similarity_model_load_seconds", "Time to load a similarity model version.").labels()
+
+
+class ModelVersion(NamedTuple):
+    version: str
+    index: SimilarityIndex
+    careers: Optional[CareerIndex] = None # Absent for models built without per-feature data
+
+
+class ModelRegistry:
+    """
+    Versioned store for similarity model artifacts.
+
+    Each build is published into its own `<root>/<version>/` directory and the
+    CURRENT file is then switched to it atomically. The serving process keeps one
+    loaded `ModelVersion` in `active`; a reload builds the new version completely
+    before swapping the reference, so requests that already picked up the old
+    version finish on it.
+    """
+
+    def __init__(self, root=None, on_change=None):
+        self.root = root or INDEX_PATH
+        self.on_change = on_change # Called with the new ModelVersion after every swap
+        self.active: Optional[ModelVersion] = None
+        self._incompatible = set() # Versions already reported as unloadable
+        self._lock = threading.Lock()
+
+    def current_version(self) -> Optional[str]:
+        """The version named by the CURRENT file, or None if nothing was published."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, index: SimilarityIndex, version: Optional[str] = None) -> str:
+        """Writes `index` as a new version and makes it the current one."""
+        version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        index.save(os.path.join(self.root, version))
+
+        tmp_path = os.path.join(self.root, f".{CURRENT_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+        self._prune(keep=version)
+        return version
+
+    def refresh(self) -> Optional[ModelVersion]:
+        """
+        Loads the current version if it differs from the active one and swaps it in.
+        Returns the active version afterwards (None if no model was ever published).
+        """
+        with self._lock:
+            version = self.current_version()
+            if version is None:
+                return self.active
+            if self.active is not None and self.active.version == version:
+                return self.active
+
+            try:
+                with timed(model_load_seconds, span="model_load"):
+                    index = SimilarityIndex.load(os.path.join(self.root, version))
+                    careers = CareerIndex.from_index(index) if index.features is not None else None
+            except IncompatibleModelError as e:
+                # Logged once per version, not on every poll; the active version stays in service
+                if version not in self._incompatible:
+                    self._incompatible.add(version)
+                    logger.warning(f"Skipping similarity model version {version}: {e} Rebuild the model.")
+                return self.active
+            previous, self.active = self.active, ModelVersion(version, index, careers)
+            logger.info(
+                f"Similarity model version {version} is now active "
+                f"(previous: {previous.version if previous else None})."
+            )
+            if self.on_change is not None:
+                self.on_change(self.active)
+            return self.active
+
+    def _prune(self, keep):
+        versions = sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name)) and name != keep
+        )
+        for name in versions[:max(len(versions) - (KEEP_VERSIONS - 1), 0)]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
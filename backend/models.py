@@ -1,21 +1,53 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
 
+# Player columns searched by name prefix
+NAME_COLUMNS = ("first_name", "last_name")
+
+
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        # Team filters paginated by id, and the team side of (team, season) lookups
+        Index("ix_players_team_id", "team", "id"),
+        # Name prefix search (LIKE 'prefix%'). PostgreSQL only uses an index for it with
+        # text_pattern_ops under non-C collations; SQLite's LIKE ignores case, so it needs NOCASE.
+        *[
+            Index(f"ix_players_{name}_pattern", name, postgresql_ops={name: "text_pattern_ops"}).ddl_if(dialect="postgresql")
+            for name in NAME_COLUMNS
+        ],
+        *[
+            Index(f"ix_players_{name}_nocase", text(f"{name} COLLATE NOCASE")).ddl_if(dialect="sqlite")
+            for name in NAME_COLUMNS
+        ],
+    )
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, index=True)
     last_name = Column(String, index=True)
     team = Column(String, index=True)
-    stats = relationship("PlayerStat", back_populates="player", cascade="all, delete-orphan") # if you delete a player, all of their associated stats will be automatically deleted too
+    # if you delete a player, all of their associated stats will be automatically deleted too
+    stats = relationship("PlayerStat", back_populates="player", cascade="all, delete-orphan")
+
 
 class PlayerStat(Base):
     __tablename__ = "player_stats"
+    __table_args__ = (
+        # One stat line per player and season (a traded player's line is their season total).
+        # Its leading player_id also serves the foreign key and every relationship load.
+        Index("uq_player_stats_player_season", "player_id", "season", unique=True),
+        # Season filters that join or correlate back to the player
+        Index("ix_player_stats_season_player", "season", "player_id"),
+        # A team's roster by season (the similarity batch filter)
+        Index("ix_player_stats_team_season", "team", "season", "player_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     season = Column(String, index=True)
+    # The team the player played for that season (the first one, for traded players), so
+    # season aggregates don't move when the player's current team changes
+    team = Column(String)
 
     # --- Basic Stats ---
     points_per_game = Column(Float)
@@ -34,8 +66,55 @@ class PlayerStat(Base):
     player_id = Column(Integer, ForeignKey("players.id"))
     player = relationship("Player", back_populates="stats")
 
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+
+
+# --- Precomputed season summaries, rebuilt by season_summary.refresh_season_summaries ---
+class SeasonStatSummary(Base):
+    """Aggregates of one stat column for a season, per team and league-wide (team 'ALL')."""
+    __tablename__ = "season_stat_summaries"
+    __table_args__ = (Index("ix_season_stat_summaries_lookup", "season", "stat", "team", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    season = Column(String, nullable=False)
+    team = Column(String, nullable=False)
+    stat = Column(String, nullable=False)
+    players = Column(Integer, nullable=False)
+    mean = Column(Float)
+    minimum = Column(Float)
+    maximum = Column(Float)
+    p10 = Column(Float)
+    p25 = Column(Float)
+    median = Column(Float)
+    p75 = Column(Float)
+    p90 = Column(Float)
+
+
+class StatLeader(Base):
+    """League-wide rank of every player's value of one stat column in a season."""
+    __tablename__ = "stat_leaders"
+    __table_args__ = (
+        Index("ix_stat_leaders_rank", "season", "stat", "rank"),
+        Index("ix_stat_leaders_team_rank", "season", "stat", "team", "rank"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    season = Column(String, nullable=False)
+    stat = Column(String, nullable=False)
+    rank = Column(Integer, nullable=False)
+    percentile = Column(Float, nullable=False) # Share of the league at or below this value
+    value = Column(Float, nullable=False)
+    team = Column(String, nullable=False)
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
+
+
+class StaleSeason(Base):
+    """A season whose aggregates and leaderboards are rebuilt on the next read, after its stat lines changed."""
+    __tablename__ = "stale_seasons"
+
+    season = Column(String, primary_key=True)
@@ -0,0 +1,206 @@
+# backend/response_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlencode
+
+
+class CacheBackend(ABC):
+    """Storage interface for cached responses. Values are opaque bytes."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float, generation: Optional[int] = None) -> None:
+        """Stores the value; with a `generation`, only if no invalidation happened since it was read."""
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        """Drops every cached entry."""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """A counter that every invalidate() moves forward."""
+
+
+class LRUBackend(CacheBackend):
+    """
+    In-process cache holding at most `maxsize` entries, each expiring after its TTL.
+    Values can be any Python object when it is used directly rather than by ResponseCache.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict() # key -> (expires_at, value)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def generation(self):
+        return self._generation
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedBackend(CacheBackend):
+    """
+    Cache stored in a key-value service shared by all workers (e.g. a redis-py client).
+    The client needs `get(key)`, `set(key, value, ex=seconds)` and `incr(key)`.
+    Invalidation bumps a generation counter that is part of every key, so one call
+    invalidates the entries of every worker and stale ones simply expire.
+    """
+
+    def __init__(self, client, namespace="wnba:response"):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key, generation=None):
+        if generation is None:
+            generation = self.generation()
+        return f"{self.namespace}:{generation}:{key}"
+
+    def get(self, key):
+        return self.client.get(self._key(key))
+
+    def set(self, key, value, ttl, generation=None):
+        # A value computed before an invalidation lands under the old generation, which nobody reads
+        self.client.set(self._key(key, generation), value, ex=max(int(ttl), 1))
+
+    def invalidate(self):
+        self.client.incr(f"{self.namespace}:generation")
+
+    def generation(self):
+        return int(self.client.get(f"{self.namespace}:generation") or b"0")
+
+
+class LocalKeyValueStore:
+    """Stand-in for a shared key-value client (same calls as redis-py), for tests and local runs."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, (b"0", None))[0]) + 1
+            self._data[key] = (str(value).encode(), None)
+            return value
+
+
+def backend_from_env() -> CacheBackend:
+    """
+    The backend selected by the environment. RESPONSE_CACHE_REDIS_URL selects a SharedBackend
+    on that Redis server (needs the redis package) and is required when more than one worker
+    or instance serves the API: the default in-process LRU is only invalidated by writes
+    handled by its own worker, so the others would serve stale responses until the TTL.
+    """
+    redis_url = os.getenv("RESPONSE_CACHE_REDIS_URL")
+    if redis_url:
+        import redis # Only needed for a shared cache
+        return SharedBackend(redis.Redis.from_url(redis_url))
+    return LRUBackend(maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")))
+
+
+class CachedResponse:
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+    def to_bytes(self):
+        return json.dumps({
+            "status_code": self.status_code, "body": self.body.decode(), "headers": self.headers,
+        }).encode()
+
+    @classmethod
+    def from_bytes(cls, data):
+        entry = json.loads(data)
+        return cls(entry["status_code"], entry["body"].encode(), entry["headers"])
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluates an If-None-Match header against a response's ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """Caches serialized GET responses by route and query parameters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key(path, query_params):
+        # Re-encoded, so an escaped '&' or '=' inside a value can't pass for another parameter
+        return path + "?" + urlencode(sorted(query_params.multi_items()))
+
+    def get(self, key) -> Optional[CachedResponse]:
+        data = self.backend.get(key)
+        return CachedResponse.from_bytes(data) if data is not None else None
+
+    def set(self, key, response: CachedResponse, generation: Optional[int] = None):
+        """Stores the response, unless the cache was invalidated after `generation` was read."""
+        self.backend.set(key, response.to_bytes(), self.ttl, generation)
+
+    def invalidate(self):
+        self.backend.invalidate()
+
+    def generation(self) -> int:
+        return self.backend.generation()
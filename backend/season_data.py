@@ -0,0 +1,186 @@
+# backend/season_data.py
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Characters read from a season file per step when streaming a JSON array
+READ_SIZE = 1 << 16
+# Records handed to consumers per chunk by iter_chunks
+CHUNK_SIZE = 5000
+# File extensions read as newline-delimited JSON (one record per line)
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Cleaned, typed Parquet copies of the season files, keyed by a fingerprint of the input
+CACHE_DIR = os.getenv("SEASON_CACHE_DIR", ".season_cache")
+# Bumped whenever the cleaning rules change, so older cached copies are not reused
+CACHE_FORMAT = 2
+# Text columns of the cleaned data; every other column is stored as float64
+STRING_COLUMNS = ['Player', 'Team', 'Pos', 'season']
+# Columns of the cleaned data: those the scraper writes, plus the season. Others are dropped,
+# and ones a file lacks are stored as nulls, so every chunk has the same schema.
+SEASON_COLUMNS = [
+    'Player', 'Team', 'Pos', 'G', 'MP', 'GS', 'FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA', '2P%',
+    'FT', 'FTA', 'FT%', 'ORB', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PER', 'TS%', 'eFG%', '3PAr',
+    'FTr', 'ORB%', 'TRB%', 'AST%', 'STL%', 'BLK%', 'TOV%', 'USG%', 'ORtg', 'DRtg', 'OWS', 'DWS', 'WS', 'WS/40',
+    'season',
+]
+SEASON_SCHEMA = pa.schema([(column, pa.string() if column in STRING_COLUMNS else pa.float64()) for column in SEASON_COLUMNS])
+
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def season_from_filename(file_name):
+    """Extracts the season year from a file name like 'data/wnba_combined_2024.json'."""
+    match = re.search(r'(\d{4})', os.path.basename(file_name))
+    if match is None:
+        raise ValueError(f"Cannot determine the season of {file_name}")
+    return match.group(1)
+
+
+def _iter_json_array(f):
+    """
+    Yields the elements of a top-level JSON array one at a time while reading the file
+    in READ_SIZE pieces, so memory is bounded by the largest single record.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Expected a JSON array of records")
+    pos, eof = 1, False
+
+    while True:
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # A record that runs up to the end of the buffer may be cut off; read more first
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise ValueError("Unterminated or malformed JSON array")
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+
+
+def iter_records(file_name):
+    """
+    Streams the records of a season file. `.ndjson`/`.jsonl` files hold one JSON
+    record per line; any other file is read as the JSON array written by the scraper.
+    """
+    with open(file_name, 'r') as f:
+        if file_name.endswith(NDJSON_EXTENSIONS):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def iter_chunks(records, size=CHUNK_SIZE):
+    """Groups a stream of records into lists of at most `size` records."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def file_fingerprint(file_name):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _clean_chunk(records, year):
+    """Cleans and types one chunk of raw records into an Arrow table with SEASON_SCHEMA."""
+    df = pd.DataFrame(records).reindex(columns=SEASON_COLUMNS)
+    df['season'] = year
+    df = df.dropna(subset=['Player']) # Drop rows with no player name
+    df['Player'] = df['Player'].str.replace('*', '', regex=False)
+    for column in df.columns:
+        if column in STRING_COLUMNS:
+            df[column] = df[column].astype('string')
+        else:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    return pa.Table.from_pandas(df, schema=SEASON_SCHEMA, preserve_index=False)
+
+
+def write_season_cache(file_name, cache_path):
+    """
+    Parses a season file once and writes the cleaned table as Parquet, one row group
+    per chunk, so memory is bounded by a chunk rather than the whole season.
+    """
+    year = season_from_filename(file_name)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with pq.ParquetWriter(tmp_path, SEASON_SCHEMA) as writer:
+            for chunk in iter_chunks(iter_records(file_name)):
+                writer.write_table(_clean_chunk(chunk, year))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, cache_path)
+
+
+def season_cache(file_name, fingerprint=None):
+    """
+    Returns the path of the cleaned Parquet copy of a season file, creating it if the
+    file changed since it was last parsed, and whether it was already cached.
+    """
+    fingerprint = fingerprint or file_fingerprint(file_name)
+    base_name = os.path.basename(file_name)
+    cache_path = os.path.join(CACHE_DIR, f"{base_name}.v{CACHE_FORMAT}.{fingerprint[:16]}.parquet")
+    if os.path.exists(cache_path):
+        return cache_path, True
+
+    write_season_cache(file_name, cache_path)
+    for name in os.listdir(CACHE_DIR): # Drop cached copies of older versions of this file
+        path = os.path.join(CACHE_DIR, name)
+        if name.startswith(f"{base_name}.") and name.endswith(".parquet") and path != cache_path:
+            os.remove(path)
+    return cache_path, False
+
+
+def _available(cache_path, columns):
+    names = pq.read_schema(cache_path).names
+    return [column for column in columns if column in names]
+
+
+def read_season(file_name, columns, fingerprint=None):
+    """
+    Reads only `columns` of a season's cleaned data. Columns outside SEASON_COLUMNS
+    are left out of the frame. Returns the frame and whether the cache was reused.
+    """
+    cache_path, cached = season_cache(file_name, fingerprint)
+    return pq.read_table(cache_path, columns=_available(cache_path, columns)).to_pandas(), cached
+
+
+def iter_season_records(file_name, columns, batch_size=CHUNK_SIZE):
+    """
+    Streams `columns` of a season's cleaned data as dicts, one Parquet batch at a time.
+    Null values are left out of each record so callers' defaults apply.
+    """
+    cache_path, _ = season_cache(file_name)
+    parquet_file = pq.ParquetFile(cache_path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=_available(cache_path, columns)):
+        for record in batch.to_pylist():
+            yield {key: value for key, value in record.items() if value is not None and value == value}
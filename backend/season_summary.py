@@ -0,0 +1,120 @@
+# backend/season_summary.py
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import PlayerStat, SeasonStatSummary, StaleSeason, StatLeader
+
+# PlayerStat columns that get leaderboards and aggregates
+STAT_COLUMNS = [
+    'points_per_game', 'rebounds_per_game', 'assists_per_game', 'games_played', 'games_started',
+    'field_goal_percentage', 'three_point_percentage', 'steals_per_game', 'blocks_per_game',
+    'player_efficiency_rating',
+]
+# Team of the league-wide aggregate rows
+LEAGUE = "ALL"
+# Rows sent per INSERT statement
+BATCH_SIZE = 1000
+
+
+def _aggregate(season, team, stat, values):
+    p10, p25, median, p75, p90 = np.percentile(values, [10, 25, 50, 75, 90])
+    return dict(
+        season=season, team=team, stat=stat, players=len(values), mean=float(values.mean()),
+        minimum=float(values.min()), maximum=float(values.max()),
+        p10=float(p10), p25=float(p25), median=float(median), p75=float(p75), p90=float(p90),
+    )
+
+
+def summarize_season(season, rows):
+    """
+    Computes the aggregate and leaderboard rows of one season from its stat rows,
+    given as (player_id, team, {stat: value}) tuples. Missing values are skipped.
+    """
+    summaries, leaders = [], []
+    for stat in STAT_COLUMNS:
+        entries = [(values[stat], player_id, team) for player_id, team, values in rows if values.get(stat) is not None]
+        if not entries:
+            continue
+        # Highest value first; ties keep a stable order by player id
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        values = np.array([value for value, _, _ in entries], dtype=np.float64)
+
+        summaries.append(_aggregate(season, LEAGUE, stat, values))
+        teams = {}
+        for value, _, team in entries:
+            teams.setdefault(team, []).append(value)
+        summaries.extend(_aggregate(season, team, stat, np.array(team_values)) for team, team_values in teams.items())
+
+        # Fraction of the league with a value <= each entry's value
+        at_or_below = np.searchsorted(np.sort(values), values, side="right") / len(values)
+        leaders.extend(
+            dict(season=season, stat=stat, rank=rank, percentile=round(float(percentile) * 100, 1),
+                 value=value, team=team, player_id=player_id)
+            for rank, ((value, player_id, team), percentile) in enumerate(zip(entries, at_or_below), start=1)
+        )
+    return summaries, leaders
+
+
+def _lock_season(db: Session, season):
+    """
+    On PostgreSQL, waits for other transactions that changed or rebuild the season's
+    summaries; the lock is held until the caller commits. SQLite serializes writers itself.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"season_summary:{season}"))))
+
+
+def mark_seasons_stale(db: Session, seasons):
+    """
+    Records that the stat lines of these seasons changed, in the caller's transaction.
+    Their summaries are rebuilt once, by the next read, however many writes came before it.
+    """
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    for season in sorted(set(seasons)):
+        _lock_season(db, season)
+        db.execute(dialect_insert(StaleSeason).values(season=season).on_conflict_do_nothing())
+
+
+def refresh_stale_season(db: Session, season) -> bool:
+    """
+    Rebuilds the summaries of `season` if a write marked it stale. Returns whether it did;
+    the caller then commits. Concurrent readers wait for the first one and find it fresh.
+    """
+    stale = select(StaleSeason.season).where(StaleSeason.season == season)
+    if db.scalar(stale) is None:
+        return False
+    _lock_season(db, season)
+    # Checked again under the lock: another reader may have rebuilt it meanwhile
+    if db.scalar(stale) is None:
+        return False
+    refresh_season_summaries(db, [season])
+    return True
+
+
+def refresh_season_summaries(db: Session, seasons):
+    """
+    Rebuilds the precomputed aggregates and leaderboards of the given seasons from
+    player_stats and clears their stale marks. Pending changes are flushed first;
+    the caller commits.
+    """
+    db.flush()
+    for season in sorted(set(seasons)):
+        _lock_season(db, season)
+        db.execute(delete(StaleSeason).where(StaleSeason.season == season))
+        rows = [
+            (player_id, team, dict(zip(STAT_COLUMNS, values)))
+            for player_id, team, *values in db.execute(
+                select(PlayerStat.player_id, PlayerStat.team, *[getattr(PlayerStat, stat) for stat in STAT_COLUMNS])
+                .where(PlayerStat.season == season)
+            )
+        ]
+        summaries, leaders = summarize_season(season, rows)
+
+        db.execute(delete(SeasonStatSummary).where(SeasonStatSummary.season == season))
+        db.execute(delete(StatLeader).where(StatLeader.season == season))
+        for start in range(0, len(summaries), BATCH_SIZE):
+            db.execute(insert(SeasonStatSummary), summaries[start:start + BATCH_SIZE])
+        for start in range(0, len(leaders), BATCH_SIZE):
+            db.execute(insert(StatLeader), leaders[start:start + BATCH_SIZE])
@@ -1,8 +1,12 @@
 # backend/seed_database.py
-import json
 import logging
+import time
+from sqlalchemy import insert, update
 from database import SessionLocal, engine
-from models import Player, PlayerStat, Base
+from migrations import upgrade
+from models import Player, PlayerStat
+from season_data import iter_season_records, season_from_filename
+from season_summary import refresh_season_summaries
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,88 +16,159 @@ DATA_FILES = [
     'data/wnba_combined_2024.json'
 ]
 
-def seed_data():
+# Columns of the cleaned season data the seeder needs
+SOURCE_COLUMNS = ['Player', 'Team', 'G', 'GS', 'PTS', 'TRB', 'AST', 'STL', 'BLK', 'FG%', '3P%', 'PER']
+# Rows sent per INSERT/UPDATE statement
+BATCH_SIZE = 1000
+
+
+def split_name(player_name):
+    first_name, *last_name_parts = player_name.split(' ')
+    return first_name, ' '.join(last_name_parts)
+
+
+def stat_values(player_data, year):
+    """Converts one row of the season file into PlayerStat column values."""
+    # The JSON provides season totals, so per-game stats are derived from games played ('G')
+    games_played = player_data.get('G', 1)
+    if games_played == 0: games_played = 1 # Avoid division by zero
+
+    return dict(
+        season=year,
+
+        # -- Basic Per-Game Stats --
+        points_per_game=round(player_data.get('PTS', 0) / games_played, 1),
+        rebounds_per_game=round(player_data.get('TRB', 0) / games_played, 1),
+        assists_per_game=round(player_data.get('AST', 0) / games_played, 1),
+
+        # -- Add the richer data --
+        games_played=int(player_data.get('G', 0)),
+        games_started=int(player_data.get('GS', 0)),
+        field_goal_percentage=player_data.get('FG%', 0.0),
+        three_point_percentage=player_data.get('3P%', 0.0),
+        steals_per_game=round(player_data.get('STL', 0) / games_played, 1),
+        blocks_per_game=round(player_data.get('BLK', 0) / games_played, 1),
+        player_efficiency_rating=player_data.get('PER', 0.0)
+    )
+
+
+def season_records(records, year):
+    """
+    Yields one (player_name, team, stat values) record per player for a season.
+    Players who appear for several teams have a 'TOT' row with their season totals;
+    that row is used for the stats and the first real team is kept as the player's team.
+
+    `records` can be a stream: only the compact per-player state is kept in memory.
+    """
+    teams, team_stats, total_stats = {}, {}, {}
+    for player_data in records:
+        player_name, team = player_data.get("Player"), player_data.get("Team")
+        if not player_name or not team:
+            continue
+        if team == 'TOT':
+            total_stats.setdefault(player_name, stat_values(player_data, year))
+        elif player_name not in teams:
+            teams[player_name] = team
+            team_stats[player_name] = stat_values(player_data, year)
+
+    # Players with only a 'TOT' row are skipped since we can't find a real team
+    for player_name, team in teams.items():
+        yield player_name, team, total_stats.get(player_name, team_stats[player_name])
+
+
+def _batches(rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def _existing_players(db):
+    return {
+        (first_name, last_name): (player_id, team)
+        for player_id, first_name, last_name, team in db.query(Player.id, Player.first_name, Player.last_name, Player.team)
+    }
+
+
+def upsert_players(db, teams_by_name):
+    """
+    Inserts missing players and updates the team of existing ones, matched by name.
+    Returns a mapping of player name to player id.
+    """
+    existing = _existing_players(db)
+    new_rows, changed_rows = [], []
+    for player_name, team in teams_by_name.items():
+        first_name, last_name = split_name(player_name)
+        if (first_name, last_name) not in existing:
+            new_rows.append({"first_name": first_name, "last_name": last_name, "team": team})
+        elif existing[(first_name, last_name)][1] != team:
+            changed_rows.append({"id": existing[(first_name, last_name)][0], "team": team})
+
+    for batch in _batches(new_rows):
+        db.execute(insert(Player), batch)
+    for batch in _batches(changed_rows):
+        db.execute(update(Player), batch)
+
+    if new_rows:
+        existing = _existing_players(db)
+    logger.info(f"Players: {len(new_rows)} inserted, {len(changed_rows)} updated.")
+    return {name: existing[split_name(name)][0] for name in teams_by_name}
+
+
+def upsert_stats(db, stat_rows, season):
+    """
+    Inserts or updates one PlayerStat row per (player_id, season) for a single season.
+    Returns the number of inserted and updated rows.
+    """
+    existing = {
+        (player_id, season): stat_id
+        for stat_id, player_id, season in db.query(PlayerStat.id, PlayerStat.player_id, PlayerStat.season)
+        .filter(PlayerStat.season == season)
+    }
+    new_rows, changed_rows = [], []
+    for values in stat_rows:
+        stat_id = existing.get((values["player_id"], values["season"]))
+        if stat_id is None:
+            new_rows.append(values)
+        else:
+            changed_rows.append({**values, "id": stat_id})
+
+    for batch in _batches(new_rows):
+        db.execute(insert(PlayerStat), batch)
+    for batch in _batches(changed_rows):
+        db.execute(update(PlayerStat), batch)
+    return len(new_rows), len(changed_rows)
+
+
+def seed_data(data_files=DATA_FILES):
+    start = time.perf_counter()
     db = SessionLocal()
     logger.info("Database connection established.")
 
     try:
-        # Clear old data for a fresh start
-        num_stats_deleted = db.query(PlayerStat).delete()
-        num_players_deleted = db.query(Player).delete()
-        db.commit()
-        logger.info(f"Cleared old data: {num_players_deleted} players and {num_stats_deleted} stats records deleted.")
-
-        all_players = {} # A dictionary to keep track of players we've added
-
-        for file_name in DATA_FILES:
-            year = file_name.split('_')[2].split('.')[0] # Extract year from filename
+        inserted = updated = 0
+        for file_name in data_files:
+            year = season_from_filename(file_name)
             logger.info(f"Processing data for {year} from {file_name}...")
 
-            with open(file_name, 'r') as f:
-                data = json.load(f)
-
-            for player_data in data:
-                player_name = player_data.get("Player")
-                team = player_data.get("Team")
-
-                if not player_name or not team:
-                    continue
-
-                # Check if we've already created this player
-                if player_name not in all_players:
-                    # Handle cases where a player played for multiple teams (e.g., 'TOT' for total)
-                    # We'll take the first team we see for simplicity
-                    if team == 'TOT':
-                       # Find the first real team abbreviation for that player in the dataset
-                       real_team_row = next((p for p in data if p.get('Player') == player_name and p.get('Team') != 'TOT'), None)
-                       if real_team_row:
-                           team = real_team_row.get('Team')
-                       else:
-                           continue # Skip if we can't find a real team
-
-                    first_name, *last_name_parts = player_name.split(' ')
-                    last_name = ' '.join(last_name_parts)
-
-                    new_player = Player(
-                        first_name=first_name,
-                        last_name=last_name,
-                        team=team
-                    )
-                    db.add(new_player)
-                    db.commit()
-                    db.refresh(new_player)
-                    all_players[player_name] = new_player.id
-                    logger.info(f"Created player: {player_name}")
-
-                # Create the stat line for this player and season
-                # Note: We are using the per-game stats if available, otherwise totals.
-                # Your JSON has both, e.g., 'PTS' (total) and 'PTS' per game is usually calculated.
-                # Let's assume your JSON provides total points and games played ('G')
-                games_played = player_data.get('G', 1)
-                if games_played == 0: games_played = 1 # Avoid division by zero
-
-                new_stat = PlayerStat(
-                    player_id=all_players[player_name],
-                    season=year,
-
-                    # -- Basic Per-Game Stats --
-                    points_per_game=round(player_data.get('PTS', 0) / games_played, 1),
-                    rebounds_per_game=round(player_data.get('TRB', 0) / games_played, 1),
-                    assists_per_game=round(player_data.get('AST', 0) / games_played, 1),
-
-                    # -- Add the richer data --
-                    games_played=player_data.get('G', 0),
-                    games_started=player_data.get('GS', 0),
-                    field_goal_percentage=player_data.get('FG%', 0.0),
-                    three_point_percentage=player_data.get('3P%', 0.0),
-                    steals_per_game=round(player_data.get('STL', 0) / games_played, 1),
-                    blocks_per_game=round(player_data.get('BLK', 0) / games_played, 1),
-                    player_efficiency_rating=player_data.get('PER', 0.0)
-                )
-                db.add(new_stat)
+            # Stream the needed columns; only one record per player is held for the season
+            records = list(season_records(iter_season_records(file_name, SOURCE_COLUMNS), year))
 
+            # Seasons are processed in order, so a player's latest team wins
+            player_ids = upsert_players(db, {player_name: team for player_name, team, _ in records})
+            stat_rows = [
+                {**values, "player_id": player_ids[player_name], "team": team} for player_name, team, values in records
+            ]
+            season_inserted, season_updated = upsert_stats(db, stat_rows, year)
+            inserted, updated = inserted + season_inserted, updated + season_updated
+
+        # Rebuild the leaderboards and aggregates of the seeded seasons in the same transaction
+        refresh_season_summaries(db, [season_from_filename(file_name) for file_name in data_files])
         db.commit()
-        logger.info("Successfully seeded database from JSON files.")
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Successfully seeded database from JSON files: {inserted} stats inserted, {updated} updated "
+            f"in {elapsed:.2f}s ({(inserted + updated) / elapsed:.0f} rows/sec)."
+        )
 
     except Exception as e:
         logger.error(f"An error occurred: {e}", exc_info=True)
@@ -102,7 +177,8 @@ def seed_data():
         db.close()
         logger.info("Database session closed.")
 
+
 if __name__ == "__main__":
     logger.info("Starting database seeding process...")
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
     seed_data()
@@ -0,0 +1,240 @@
+# backend/similarity_index.py
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Directory holding the similarity model artifacts, relative to the backend root
+INDEX_PATH = os.getenv("SIMILARITY_MODEL_DIR", "similarity_model")
+VECTORS_FILE = "vectors.npy"
+LABELS_FILE = "labels.json"
+KEYS_FILE = "keys.npy"
+FEATURES_FILE = "features.npy"
+FEATURE_NAMES_FILE = "feature_names.json"
+
+# Number of query rows scored per matrix product in top_k_batch, bounding peak memory
+BATCH_BLOCK_SIZE = 256
+# Seasons are packed into the low bits of a 64-bit (player_id, season) key
+SEASON_BITS = 16
+# Number of weighted vector matrices kept per index, one per distinct set of weights
+WEIGHTED_CACHE_SIZE = 8
+
+# Named feature weightings for "similar as a ..." queries; unlisted features are ignored
+SIMILARITY_PROFILES = {
+    "scoring": {"PTS": 3.0, "FG%": 2.0, "3P%": 2.0, "AST": 1.0},
+    "defense": {"STL": 3.0, "BLK": 3.0, "TRB": 2.0},
+    "efficiency": {"PER": 3.0, "WS": 3.0, "FG%": 2.0, "3P%": 1.0},
+}
+
+
+class IncompatibleModelError(ValueError):
+    """A published model version lacks artifacts this version of the API needs."""
+
+
+def pack_keys(player_ids, seasons):
+    """Packs (player_id, season) pairs into int64 keys. Seasons must be numeric, e.g. '2024'."""
+    return (np.asarray(player_ids, dtype=np.int64) << SEASON_BITS) | np.asarray(seasons, dtype=np.int64)
+
+
+def select_top_k(scores, k):
+    """
+    Rows and scores of the `k` highest finite scores, best first. Rows to exclude
+    should be set to -inf beforehand.
+    """
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=scores.dtype)
+    # Partial selection is O(N); only the k winners get sorted
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    top = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return top, scores[top]
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index over player-season feature vectors.
+
+    Only the L2-normalized feature vectors are stored, so the cosine similarity of
+    one player-season against every other one is a single matrix-vector product.
+    Memory and artifact size grow as O(N * features) instead of the O(N^2) of a
+    precomputed similarity matrix.
+
+    Rows are identified by packed (player_id, season) keys, looked up by binary search
+    in a sorted copy of the key array. Labels are only used for display.
+
+    The standardized features are kept as well, so queries can weight features
+    (weighted cosine similarity) without a rebuild.
+    """
+
+    def __init__(self, labels, vectors, keys, features=None, feature_names=None):
+        self.labels = list(labels)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.features = None if features is None else np.asarray(features, dtype=np.float32)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        if not len(self.labels) == len(self.keys) == self.vectors.shape[0]:
+            raise ValueError("Number of labels, keys and vectors do not match.")
+        if self.features is not None and self.features.shape != self.vectors.shape:
+            raise ValueError("Features and vectors do not have the same shape.")
+        self._weighted = OrderedDict() # weights -> row-normalized weighted vectors
+        self._weighted_lock = threading.Lock()
+        self._key_order = np.argsort(self.keys, kind="stable")
+        self._sorted_keys = self.keys[self._key_order]
+        if len(self.keys) and (np.diff(self._sorted_keys) == 0).any():
+            raise ValueError("Duplicate (player_id, season) keys.")
+
+    @staticmethod
+    def _normalize(features):
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0 # An all-zero row stays zero, like sklearn's cosine_similarity
+        return features / norms
+
+    @classmethod
+    def from_features(cls, labels, features, keys, feature_names=None):
+        """Builds an index from (already scaled) feature rows by normalizing each row."""
+        features = np.asarray(features, dtype=np.float64)
+        return cls(labels, cls._normalize(features), keys, features, feature_names)
+
+    def feature_weights(self, weights):
+        """
+        Turns a {feature name: weight} mapping into a weight vector over the index's features.
+        Features that are not mentioned get weight 0. Raises ValueError for invalid weights.
+        """
+        if self.features is None or self.feature_names is None:
+            raise ValueError("This model was built without per-feature data; rebuild it to weight features.")
+        unknown = set(weights) - set(self.feature_names)
+        if unknown:
+            raise ValueError(f"Unknown features {sorted(unknown)}. Choose from {self.feature_names}.")
+        vector = np.array([weights.get(name, 0.0) for name in self.feature_names], dtype=np.float64)
+        if (vector < 0).any() or not np.isfinite(vector).all() or not vector.any():
+            raise ValueError("Weights must be finite, non-negative and not all zero.")
+        return vector
+
+    def weighted_vectors(self, weights):
+        """
+        Row-normalized vectors for a weighted cosine similarity, where feature i counts
+        weights[i] times: cos_w(a, b) = sum(w * a * b) / (|a|_w * |b|_w). Scaling every
+        feature by sqrt(w) turns that into a plain cosine, so queries stay one
+        matrix-vector product. The matrix is cached per distinct weight vector.
+        """
+        cache_key = np.asarray(weights, dtype=np.float64).tobytes()
+        with self._weighted_lock:
+            if cache_key in self._weighted:
+                self._weighted.move_to_end(cache_key)
+                return self._weighted[cache_key]
+
+        vectors = self._normalize(self.features * np.sqrt(np.asarray(weights, dtype=np.float32))).astype(np.float32)
+        with self._weighted_lock:
+            self._weighted[cache_key] = vectors
+            while len(self._weighted) > WEIGHTED_CACHE_SIZE:
+                self._weighted.popitem(last=False)
+        return vectors
+
+    def __len__(self):
+        return len(self.labels)
+
+    def find_rows(self, player_ids, seasons):
+        """Returns the row of every (player_id, season) pair, or -1 where a pair is not in the index."""
+        keys = pack_keys(player_ids, seasons)
+        if len(self) == 0:
+            return np.full(len(keys), -1, dtype=np.intp)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self) - 1)
+        return np.where(self._sorted_keys[positions] == keys, self._key_order[positions], -1)
+
+    def find(self, player_id, season):
+        """Returns the row of one player-season. Raises KeyError if it is not in the index."""
+        if not str(season).isdigit():
+            raise KeyError((player_id, season))
+        row = int(self.find_rows([player_id], [int(season)])[0])
+        if row < 0:
+            raise KeyError((player_id, season))
+        return row
+
+    def player_season(self, row):
+        """The (player_id, season) pair of a row."""
+        key = int(self.keys[row])
+        return key >> SEASON_BITS, str(key & ((1 << SEASON_BITS) - 1))
+
+    def _vectors(self, weights):
+        return self.vectors if weights is None else self.weighted_vectors(weights)
+
+    def scores(self, idx, weights=None):
+        """Cosine similarity of row `idx` against every row, optionally with per-feature weights."""
+        vectors = self._vectors(weights)
+        return vectors @ vectors[idx]
+
+    def top_k(self, idx, k, weights=None):
+        """
+        Returns the rows and scores of the `k` most similar player-seasons to row `idx`,
+        best first. The query row itself is excluded by position, not by rank.
+        """
+        scores = self.scores(idx, weights)
+        scores[idx] = -np.inf
+        return select_top_k(scores, k)
+
+    def top_k_batch(self, rows, k, weights=None):
+        """
+        Batched version of `top_k`. Scores the stacked query vectors against the index
+        with one matrix product per block and returns two (len(rows), k) arrays.
+        """
+        vectors = self._vectors(weights)
+        rows = np.asarray(rows, dtype=np.intp)
+        k = max(min(k, len(self) - 1), 0)
+        top = np.empty((len(rows), k), dtype=np.intp)
+        top_scores = np.empty((len(rows), k), dtype=self.vectors.dtype)
+        if k == 0:
+            return top, top_scores
+
+        for start in range(0, len(rows), BATCH_BLOCK_SIZE):
+            block = rows[start:start + BATCH_BLOCK_SIZE]
+            scores = vectors[block] @ vectors.T
+            scores[np.arange(len(block)), block] = -np.inf
+
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            top[start:start + len(block)] = np.take_along_axis(candidates, order, axis=1)
+            top_scores[start:start + len(block)] = np.take_along_axis(candidate_scores, order, axis=1)
+        return top, top_scores
+
+    def save(self, path):
+        """
+        Writes the vectors and keys as raw .npy arrays and the labels as a JSON side file,
+        so that `load` can memory-map the numeric data instead of unpickling it.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, VECTORS_FILE), np.ascontiguousarray(self.vectors))
+        np.save(os.path.join(path, KEYS_FILE), self.keys)
+        if self.features is not None:
+            np.save(os.path.join(path, FEATURES_FILE), np.ascontiguousarray(self.features))
+        if self.feature_names is not None:
+            with open(os.path.join(path, FEATURE_NAMES_FILE), "w") as f:
+                json.dump(self.feature_names, f)
+        with open(os.path.join(path, LABELS_FILE), "w") as f:
+            json.dump(self.labels, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads an index written by `save`. With `mmap` the vectors are mapped read-only,
+        so every worker process on a host shares one page-cache copy.
+        Raises IncompatibleModelError for versions written before rows were keyed.
+        """
+        if not os.path.exists(os.path.join(path, KEYS_FILE)):
+            raise IncompatibleModelError(
+                f"{path} has no {KEYS_FILE}; it was built before rows were keyed by (player_id, season)."
+            )
+        with open(os.path.join(path, LABELS_FILE)) as f:
+            labels = json.load(f)
+        mmap_mode = "r" if mmap else None
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode=mmap_mode)
+        # Models published before feature weighting have no features to weight
+        features = feature_names = None
+        if os.path.exists(os.path.join(path, FEATURES_FILE)):
+            features = np.load(os.path.join(path, FEATURES_FILE), mmap_mode=mmap_mode)
+        if os.path.exists(os.path.join(path, FEATURE_NAMES_FILE)):
+            with open(os.path.join(path, FEATURE_NAMES_FILE)) as f:
+                feature_names = json.load(f)
+        return cls(labels, vectors, np.load(os.path.join(path, KEYS_FILE)), features, feature_names)
@@ -1,21 +1,33 @@
 # backend/tests/conftest.py
 import pytest
 import os
+from contextlib import contextmanager
 
 # This MUST be the first thing to run. It configures the app for testing.
 os.environ['DATABASE_URL'] = "sqlite:///./test.db"
+os.environ['BCRYPT_ROUNDS'] = "4" # Minimum bcrypt cost keeps login-heavy fixtures fast
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-from main import app, get_db
-from database import Base, engine
+from main import app, response_cache
+from database import Base, async_engine, engine
 from auth.security import get_password_hash
+from auth.principals import invalidate_principals
 import models
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Values of a complete stat line; tests override the fields they look at
+STAT_LINE = {
+    "season": "2024", "points_per_game": 10.0, "rebounds_per_game": 5.0, "assists_per_game": 3.0,
+    "games_played": 40, "games_started": 40, "field_goal_percentage": 0.45,
+    "three_point_percentage": 0.35, "steals_per_game": 1.0, "blocks_per_game": 0.5,
+    "player_efficiency_rating": 15.0,
+}
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """
@@ -24,24 +36,17 @@ def db_session():
     This guarantees perfect test isolation.
     """
     # --- SETUP ---
+    # The app's async get_db already points at the test database through DATABASE_URL
     Base.metadata.create_all(bind=engine)
-
-    def override_get_db():
-        db = TestingSessionLocal()
-        try:
-            yield db
-        finally:
-            db.close()
-
-    # Override the dependency for the duration of the test
-    app.dependency_overrides[get_db] = override_get_db
+    response_cache.invalidate()
+    invalidate_principals()
 
     yield
 
     # --- TEARDOWN ---
-    del app.dependency_overrides[get_db]
     Base.metadata.drop_all(bind=engine)
 
+
 @pytest.fixture(scope="function")
 def test_client():
     """
@@ -49,24 +54,17 @@ def test_client():
     Handles startup/shutdown events and DB table creation/destruction.
     """
     # --- SETUP ---
+    # The app's async get_db already points at the test database through DATABASE_URL
     Base.metadata.create_all(bind=engine)
-    
-    def override_get_db():
-        """This function overrides the production database dependency."""
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_db] = override_get_db
+    response_cache.invalidate()
+    invalidate_principals()
 
+    # Entering the client runs the lifespan, which disposes the async pool on exit
     with TestClient(app) as client:
         yield client
     
     # --- TEARDOWN ---
     # Clean up after the test is done
-    del app.dependency_overrides[get_db]
     Base.metadata.drop_all(bind=engine)
 
 
@@ -100,4 +98,48 @@ def authenticated_client(test_client):
     # Set the auth header for all future requests with this client
     test_client.headers["Authorization"] = f"Bearer {token}"
     
-    return test_client
\ No newline at end of file
+    return test_client
+
+
+@pytest.fixture
+def make_stat():
+    """Builds stat line values: make_stat("2023", points_per_game=20.0, player_id=1)."""
+    def make(season="2024", **fields):
+        return {**STAT_LINE, "season": season, **fields}
+    return make
+
+
+@pytest.fixture
+def capture_statements():
+    """
+    Records the SQL statements the API runs inside a block:
+        with capture_statements() as statements: ...
+    """
+    @contextmanager
+    def capture():
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return capture
+
+
+@pytest.fixture
+def seed_players(make_stat):
+    """Adds `count` players with one stat line each: 2024 for the first three, 2023 for the rest."""
+    def seed(count):
+        db = TestingSessionLocal()
+        for i in range(count):
+            team = "AAA" if i % 2 else "BBB"
+            player = models.Player(first_name=f"First{i}", last_name=f"Last{i}", team=team)
+            player.stats = [models.PlayerStat(**make_stat("2024" if i < 3 else "2023"), team=team)]
+            db.add(player)
+        db.commit()
+        db.close()
+    return seed
@@ -1,8 +1,11 @@
 # backend/tests/test_auth.py
+import pytest
+
 from auth.security import get_password_hash
 import models
 from database import SessionLocal
 
+
 def test_login_for_access_token(test_client):
     """Tests if a user can successfully log in with correct credentials."""
     # Setup: Create a user directly in the test database
@@ -22,6 +25,7 @@ def test_login_for_access_token(test_client):
     assert "access_token" in response.json()
     assert response.json()["token_type"] == "bearer"
 
+
 def test_login_with_wrong_password(test_client):
     """Tests that login fails with an incorrect password."""
     db = SessionLocal()
@@ -36,6 +40,7 @@ def test_login_with_wrong_password(test_client):
     )
     assert response.status_code == 401 # Unauthorized
 
+
 def test_read_users_as_authenticated_user(authenticated_client):
     """
     Tests that a logged-in user can successfully fetch the list of users.
@@ -55,6 +60,7 @@ def test_read_users_as_authenticated_user(authenticated_client):
     # CRITICAL: Assert that the hashed password is NOT present
     assert "hashed_password" not in data[0]
 
+
 def test_read_users_unauthenticated(test_client):
     """
     Tests that a non-logged-in user receives a 401 error when trying
@@ -62,4 +68,72 @@ def test_read_users_unauthenticated(test_client):
     """
     # We use the basic, unauthenticated client here
     response = test_client.get("/users")
-    assert response.status_code == 401 # Unauthorized   
\ No newline at end of file
+    assert response.status_code == 401 # Unauthorized   
+
+
+def test_authenticated_requests_reuse_cached_principal(authenticated_client, capture_statements):
+    """After the first lookup, protected requests do not query the users table again."""
+    authenticated_client.get("/users")
+    with capture_statements() as statements:
+        response = authenticated_client.post("/api/players", json={"first_name": "A", "last_name": "B", "team": "C"})
+
+    assert response.status_code == 200
+    assert not [s for s in statements if "FROM users" in s]
+
+
+def test_deleted_user_is_rejected_after_invalidation(authenticated_client):
+    assert authenticated_client.get("/users").status_code == 200
+
+    db = SessionLocal()
+    db.delete(db.query(models.User).filter(models.User.username == "testuser").one())
+    db.commit() # The ORM delete event drops the cached principal
+    db.close()
+
+    assert authenticated_client.get("/users").status_code == 401
+
+
+def test_login_rehashes_password_with_new_work_factor(test_client):
+    from passlib.context import CryptContext
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("pw")
+    db = SessionLocal()
+    db.add(models.User(username="oldhashuser", hashed_password=old_hash))
+    db.commit()
+    db.close()
+
+    response = test_client.post("/auth/token", data={"username": "oldhashuser", "password": "pw"})
+    assert response.status_code == 200
+
+    db = SessionLocal()
+    new_hash = db.query(models.User).filter(models.User.username == "oldhashuser").one().hashed_password
+    db.close()
+    assert new_hash != old_hash and new_hash.startswith("$2b$04$")
+
+
+def test_hashing_pool_metrics(authenticated_client):
+    response = authenticated_client.get("/api/admin/metrics")
+    assert response.status_code == 200
+    stats = response.json()["password_hashing"]
+    assert stats["completed"] >= 1
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert response.json()["database_pool"]["checked_out"] <= 1 # Only the metrics request itself
+
+
+def test_hashing_pool_rejects_when_saturated():
+    import asyncio
+    import threading
+    from auth.security import PasswordHashingPool, HashingPoolSaturated
+
+    pool = PasswordHashingPool(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HashingPoolSaturated):
+            await pool.run(lambda: None)
+        release.set()
+        await blocked
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
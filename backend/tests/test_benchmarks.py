@@ -0,0 +1,13 @@
+# backend/tests/test_benchmarks.py
+from unittest.mock import patch
+
+from benchmarks import serialization
+
+
+def test_serialization_benchmark_runs():
+    # run() checks that every encoder produces the same document as the response model
+    with patch.object(serialization, "REPEATS", 1):
+        results = serialization.run(sizes=[3])
+    assert [(name, players) for name, players, *_ in results] == [
+        ("pydantic+json", 3), ("pydantic+orjson", 3), ("rows+orjson", 3),
+    ]
@@ -0,0 +1,77 @@
+# backend/tests/test_build_similarity_model.py
+import json
+from unittest.mock import patch
+
+import pytest
+
+import build_similarity_model
+import models
+import season_data
+from database import SessionLocal
+from model_registry import ModelRegistry
+from seed_database import seed_data
+
+
+def _write_season(tmp_path, year, points):
+    path = tmp_path / f"wnba_combined_{year}.json"
+    path.write_text(json.dumps([
+        {"Player": f"Player {i}*", "Team": "AAA", "PTS": p, "TRB": i, "AST": 2} for i, p in enumerate(points)
+    ]))
+    return str(path)
+
+
+@pytest.fixture
+def build_dirs(db_session, tmp_path):
+    with patch.object(build_similarity_model, "CACHE_DIR", str(tmp_path / "cache")), \
+         patch.object(season_data, "CACHE_DIR", str(tmp_path / "season_cache")), \
+         patch("model_registry.INDEX_PATH", str(tmp_path / "model")):
+        yield tmp_path
+
+
+def test_incremental_build_reparses_only_changed_seasons(build_dirs):
+    files = [_write_season(build_dirs, 2023, [10, 20, 30]), _write_season(build_dirs, 2024, [5, 15, 25])]
+    seed_data(files)
+    first_version = build_similarity_model.build_model(files)
+    index = ModelRegistry().refresh().index
+    assert index.labels[0] == "Player 0 (2023)" and len(index) == 6
+    assert index.player_season(0) == (1, "2023") and index.find(1, "2024") == 3
+
+    with patch.object(season_data, "write_season_cache", wraps=season_data.write_season_cache) as clean:
+        # Nothing changed: no parsing and no new version
+        assert build_similarity_model.build_model(files) == first_version
+        assert clean.call_count == 0
+
+        # Only the changed season is parsed again
+        _write_season(build_dirs, 2024, [5, 15, 40])
+        second_version = build_similarity_model.build_model(files)
+        assert [call.args[0] for call in clean.call_args_list] == [files[1]]
+
+    assert second_version != first_version
+    assert ModelRegistry().current_version() == second_version
+
+
+def test_build_keys_rows_by_player_id(build_dirs):
+    path = build_dirs / "wnba_combined_2024.json"
+    path.write_text(json.dumps([
+        {"Player": "Jane Doe", "Team": "AAA", "PTS": 10},
+        {"Player": "Traded Player", "Team": "TOT", "PTS": 30},
+        {"Player": "Traded Player", "Team": "BBB", "PTS": 12},
+        {"Player": "Traded Player", "Team": "CCC", "PTS": 18},
+        {"Player": "Not Seeded", "Team": "DDD", "PTS": 1},
+    ]))
+    seed_data([str(path)])
+    db = SessionLocal()
+    db.query(models.Player).filter_by(first_name="Not").delete()
+    # A second Jane Doe on another team is told apart by team
+    db.add(models.Player(first_name="Jane", last_name="Doe", team="ZZZ"))
+    db.commit()
+    ids = {(p.first_name, p.team): p.id for p in db.query(models.Player)}
+    db.close()
+
+    build_similarity_model.build_model([str(path)])
+    index = ModelRegistry().refresh().index
+    # One row per player-season (a traded player's season total), only for known players
+    assert sorted(index.player_season(row) for row in range(len(index))) == sorted([
+        (ids[("Jane", "AAA")], "2024"), (ids[("Traded", "BBB")], "2024"),
+    ])
+    assert index.labels[index.find(ids[("Jane", "AAA")], "2024")] == "Jane Doe (2024)"
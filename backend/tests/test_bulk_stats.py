@@ -0,0 +1,101 @@
+# backend/tests/test_bulk_stats.py
+import json
+
+
+def _create_players(client, count):
+    return [
+        client.post("/api/players", json={"first_name": "Player", "last_name": str(i), "team": "AAA"}).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_bulk_stats_requires_authentication(test_client):
+    assert test_client.post("/api/stats:bulk", json=[]).status_code == 401
+
+
+def test_bulk_stats_reports_every_row(authenticated_client, make_stat):
+    first, second = _create_players(authenticated_client, 2)
+    assert authenticated_client.post(f"/api/players/{first}/stats", json=make_stat("2023")).status_code == 200
+
+    response = authenticated_client.post("/api/stats:bulk", json=[
+        make_stat("2024", player_id=first),
+        make_stat("2023", player_id=first, points_per_game=20.0), # Existing line is updated
+        make_stat("2024", player_id=9999),
+        make_stat("2024", player_id=second, games_played="many"),
+        make_stat("2024", player_id=second),
+        make_stat("2024", player_id=second),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (2, 1, 3)
+    statuses = [(result["row"], result["status"]) for result in body["results"]]
+    assert statuses == [(0, "created"), (1, "updated"), (2, "error"), (3, "error"), (4, "created"), (5, "error")]
+    assert body["results"][2]["detail"] == "Player not found"
+    assert "games_played" in body["results"][3]["detail"]
+    assert "Duplicates row 4" in body["results"][5]["detail"]
+
+    stats = {stat["season"]: stat for stat in authenticated_client.get(f"/api/players/{first}").json()["stats"]}
+    assert stats["2023"]["points_per_game"] == 20.0 and stats["2024"]["id"] == body["results"][0]["id"]
+    # Leaderboards are refreshed for the written seasons
+    leaders = authenticated_client.get("/api/seasons/2023/leaders/points_per_game").json()
+    assert leaders[0]["value"] == 20.0
+
+
+def test_bulk_stats_accepts_ndjson(authenticated_client, make_stat):
+    player_ids = _create_players(authenticated_client, 3)
+    body = "\n".join(json.dumps(make_stat("2024", player_id=player_id)) for player_id in player_ids) + "\n{not json\n"
+
+    response = authenticated_client.post(
+        "/api/stats:bulk", content=body, headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert (response.json()["created"], response.json()["failed"]) == (3, 1)
+    assert response.json()["results"][3]["detail"].startswith("Invalid JSON")
+
+
+def test_bulk_stats_uses_a_constant_number_of_queries(authenticated_client, make_stat, capture_statements):
+    player_ids = _create_players(authenticated_client, 30)
+    # Warm up the principal cache
+    authenticated_client.post("/api/stats:bulk", json=[make_stat("2022", player_id=player_ids[0])])
+
+    rows = [make_stat("2024", player_id=player_id) for player_id in player_ids]
+    with capture_statements() as statements:
+        response = authenticated_client.post("/api/stats:bulk", json=rows)
+
+    assert response.json()["created"] == 30
+    writes = [statement for statement in statements if statement.startswith("INSERT INTO player_stats")]
+    assert len(writes) == 1
+    assert len([statement for statement in statements if "FROM players" in statement]) <= 2
+
+
+def test_bulk_stats_rejects_a_non_list_body(authenticated_client):
+    response = authenticated_client.post("/api/stats:bulk", json={"player_id": 1})
+    assert response.status_code == 422
+
+
+def test_bulk_stats_rejects_an_oversized_body(authenticated_client, make_stat, monkeypatch):
+    import bulk_stats
+    monkeypatch.setattr(bulk_stats, "MAX_BODY_BYTES", 100)
+    rows = json.dumps([make_stat("2024", player_id=1)] * 3).encode()
+
+    # Rejected on Content-Length, and while reading a body sent without one
+    assert authenticated_client.post("/api/stats:bulk", content=rows).status_code == 413
+    chunked = authenticated_client.post("/api/stats:bulk", content=iter([rows[:64], rows[64:]]))
+    assert chunked.status_code == 413
+
+
+def test_bulk_stats_looks_up_players_in_chunks(authenticated_client, make_stat, monkeypatch, capture_statements):
+    import bulk_stats
+    monkeypatch.setattr(bulk_stats, "LOOKUP_CHUNK_SIZE", 2)
+    player_ids = _create_players(authenticated_client, 5)
+    authenticated_client.post("/api/stats:bulk", json=[make_stat("2023", player_id=player_ids[0])])
+
+    with capture_statements() as statements:
+        response = authenticated_client.post("/api/stats:bulk", json=[
+            make_stat(season, player_id=player_id) for player_id in player_ids for season in ("2023", "2024")
+        ])
+
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (9, 1, 0)
+    assert len({result["id"] for result in body["results"]}) == 10
+    assert len([statement for statement in statements if statement.startswith("SELECT players.id, players.team")]) == 3
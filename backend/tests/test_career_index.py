@@ -0,0 +1,54 @@
+# backend/tests/test_career_index.py
+import numpy as np
+import pytest
+
+from career_index import CareerIndex
+from similarity_index import SimilarityIndex, pack_keys
+
+
+def _careers(lengths, seed=0):
+    """An index with one row per player-season, given each player's career length, in shuffled order."""
+    rng = np.random.default_rng(seed)
+    rows = [(player_id, 2010 + season) for player_id, length in enumerate(lengths, start=1) for season in range(length)]
+    rows = [rows[i] for i in rng.permutation(len(rows))]
+    features = rng.normal(size=(len(rows), 4))
+    labels = [f"Player {player_id} ({season})" for player_id, season in rows]
+    index = SimilarityIndex.from_features(labels, features, pack_keys(*zip(*rows)), ["A", "B", "C", "D"])
+    return index, rows, features
+
+
+def test_career_scores_match_brute_force():
+    lengths = [5, 3, 7, 2, 4, 6]
+    index, rows, features = _careers(lengths)
+    careers = CareerIndex.from_index(index)
+
+    by_player = {}
+    for (player_id, season), vector in sorted(zip(rows, features.tolist())):
+        by_player.setdefault(player_id, []).append(vector)
+    num_seasons = 3
+    query = np.ravel(by_player[1][:num_seasons])
+    expected = {
+        player_id: float(
+            np.dot(query, np.ravel(seasons[:num_seasons]))
+            / (np.linalg.norm(query) * np.linalg.norm(np.ravel(seasons[:num_seasons])))
+        )
+        for player_id, seasons in by_player.items() if player_id != 1 and len(seasons) >= num_seasons
+    }
+
+    top, scores = careers.top_k(careers.find(1), num_seasons, k=10)
+    assert [int(careers.player_ids[position]) for position in top] == sorted(expected, key=expected.get, reverse=True)
+    np.testing.assert_allclose(scores, sorted(expected.values(), reverse=True), rtol=1e-5)
+    # Careers shorter than the compared span are masked out
+    assert 4 not in careers.player_ids[top]
+
+
+def test_career_layout():
+    index, _, _ = _careers([2, 1])
+    careers = CareerIndex.from_index(index)
+    assert careers.player_ids.tolist() == [1, 2] and careers.lengths.tolist() == [2, 1]
+    assert careers.seasons.tolist() == [[2010, 2011], [2010, 0]]
+    assert careers.names == ["Player 1", "Player 2"]
+    with pytest.raises(KeyError):
+        careers.find(3)
+    with pytest.raises(ValueError):
+        careers.top_k(careers.find(2), 2, k=1)
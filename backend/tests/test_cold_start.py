@@ -0,0 +1,30 @@
+# backend/tests/test_cold_start.py
+import os
+import subprocess
+import sys
+
+from benchmarks.cold_start import HEAVY_MODULES
+
+
+def test_serving_process_does_not_import_build_dependencies():
+    code = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_cold_start_phases_are_reported(test_client):
+    import main
+
+    test_client.get("/api")
+    assert {"import", "startup", "first_request"} <= set(main.cold_start_seconds)
+    body = test_client.get("/metrics").text
+    assert 'app_cold_start_seconds{phase="import"}' in body
+    assert 'app_cold_start_seconds{phase="startup"}' in body
+
+
+def test_startup_leaves_no_idle_sync_connection(test_client):
+    import database
+
+    # The migrations' connection is closed once they ran; requests use the async pool
+    assert database.engine.pool.checkedin() == 0
@@ -0,0 +1,29 @@
+# backend/tests/test_database.py
+import pytest
+
+from database import get_async_database_url
+
+
+def test_async_url_swaps_the_driver():
+    assert get_async_database_url("sqlite:///./test.db").render_as_string() == "sqlite+aiosqlite:///./test.db"
+    url = get_async_database_url("postgresql+psycopg2://user:secret@/wnba?host=/cloudsql/instance")
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.password == "secret" and url.query["host"] == "/cloudsql/instance"
+
+
+def test_async_url_rejects_unknown_backends():
+    with pytest.raises(ValueError):
+        get_async_database_url("mysql://user@localhost/wnba")
+
+
+def test_pool_stats_record_checkout_waits(test_client):
+    import database
+
+    before = database.pool_stats()["wait_seconds"]["count"]
+    assert test_client.get("/api/players").status_code == 200
+
+    stats = database.pool_stats()
+    assert stats["size"] == database.DB_POOL_SIZE
+    assert stats["checked_out"] == 0 and stats["overflow"] == 0
+    assert stats["wait_seconds"]["count"] > before
+    assert stats["wait_seconds"]["buckets"]["+Inf"] == stats["wait_seconds"]["count"]
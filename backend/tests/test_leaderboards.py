@@ -0,0 +1,100 @@
+# backend/tests/test_leaderboards.py
+import pytest
+
+import models
+from database import SessionLocal
+from season_summary import summarize_season
+
+
+def test_summarize_season_ranks_and_percentiles():
+    rows = [(1, "AAA", {"points_per_game": 10.0}), (2, "AAA", {"points_per_game": 20.0}),
+            (3, "BBB", {"points_per_game": 30.0}), (4, "BBB", {"points_per_game": None})]
+    summaries, leaders = summarize_season("2024", rows)
+
+    assert [(leader["player_id"], leader["rank"], leader["percentile"]) for leader in leaders] == [
+        (3, 1, 100.0), (2, 2, 66.7), (1, 3, 33.3),
+    ]
+    by_team = {summary["team"]: summary for summary in summaries}
+    assert by_team["ALL"]["players"] == 3 and by_team["ALL"]["median"] == 20.0
+    assert by_team["AAA"]["mean"] == 15.0 and by_team["BBB"]["maximum"] == 30.0
+
+
+@pytest.fixture
+def seeded_client(authenticated_client, make_stat):
+    for name, team, per, points in [("A", "AAA", 20.0, 15.0), ("B", "AAA", 10.0, 25.0), ("C", "BBB", 30.0, 5.0)]:
+        player = authenticated_client.post(
+            "/api/players", json={"first_name": "Player", "last_name": name, "team": team},
+        ).json()
+        stat = make_stat("2024", player_efficiency_rating=per, points_per_game=points)
+        response = authenticated_client.post(f"/api/players/{player['id']}/stats", json=stat)
+        assert response.status_code == 200
+    return authenticated_client
+
+
+def test_stat_leaders(seeded_client):
+    response = seeded_client.get("/api/seasons/2024/leaders/player_efficiency_rating", params={"limit": 2})
+    assert response.status_code == 200
+    leaders = [(leader["last_name"], leader["rank"], leader["value"]) for leader in response.json()]
+    assert leaders == [("C", 1, 30.0), ("A", 2, 20.0)]
+
+    team_leaders = seeded_client.get("/api/seasons/2024/leaders/points_per_game", params={"team": "AAA"}).json()
+    assert [(leader["last_name"], leader["rank"]) for leader in team_leaders] == [("B", 1), ("A", 2)]
+
+
+def test_stat_leaders_unknown_stat(seeded_client):
+    assert seeded_client.get("/api/seasons/2024/leaders/hashed_password").status_code == 404
+
+
+def test_season_aggregates(seeded_client):
+    response = seeded_client.get("/api/seasons/2024/aggregates", params={"stat": "points_per_game"})
+    assert response.status_code == 200
+    by_team = {row["team"]: row for row in response.json()}
+    assert set(by_team) == {"ALL", "AAA", "BBB"}
+    assert by_team["AAA"]["mean"] == 20.0 and by_team["ALL"]["players"] == 3
+
+
+def test_summaries_follow_player_changes(seeded_client):
+    assert seeded_client.get("/api/seasons/2024/leaders/points_per_game").json()[0]["last_name"] == "B"
+    leader_id = seeded_client.get("/api/seasons/2024/leaders/points_per_game").json()[0]["player_id"]
+
+    # A move to another team doesn't rewrite the seasons already played
+    seeded_client.put(f"/api/players/{leader_id}", json={"first_name": "Player", "last_name": "B", "team": "BBB"})
+    aggregates = seeded_client.get("/api/seasons/2024/aggregates", params={"stat": "points_per_game", "team": "BBB"}).json()
+    assert aggregates[0]["players"] == 1
+    team_leaders = seeded_client.get("/api/seasons/2024/leaders/points_per_game", params={"team": "AAA"}).json()
+    assert [leader["last_name"] for leader in team_leaders] == ["B", "A"]
+
+    seeded_client.delete(f"/api/players/{leader_id}")
+    leaders = seeded_client.get("/api/seasons/2024/leaders/points_per_game").json()
+    assert [leader["last_name"] for leader in leaders] == ["A", "C"]
+
+
+def test_duplicate_season_stats_conflict(seeded_client, make_stat):
+    player_id = seeded_client.get("/api/seasons/2024/leaders/points_per_game").json()[0]["player_id"]
+    response = seeded_client.post(f"/api/players/{player_id}/stats", json=make_stat("2024", points_per_game=1.0))
+    assert response.status_code == 409
+    assert seeded_client.get("/api/seasons/2024/leaders/points_per_game").json()[0]["value"] == 25.0
+
+
+def test_stat_writes_defer_the_rebuild_to_the_next_read(seeded_client):
+    # The seeding writes only marked the season stale; nothing was summarized yet
+    db = SessionLocal()
+    assert [row.season for row in db.query(models.StaleSeason)] == ["2024"]
+    assert db.query(models.StatLeader).count() == 0
+
+    assert seeded_client.get("/api/seasons/2024/aggregates", params={"team": "ALL"}).status_code == 200
+    assert db.query(models.StaleSeason).count() == 0
+    assert db.query(models.StatLeader).filter_by(stat="points_per_game").count() == 3
+    db.close()
+
+
+def test_only_the_season_index_is_a_conflict():
+    from sqlalchemy.exc import IntegrityError
+    from main import is_duplicate_season
+
+    def error(message):
+        return IntegrityError("INSERT INTO player_stats ...", {}, Exception(message))
+
+    assert is_duplicate_season(error('duplicate key value violates unique constraint "uq_player_stats_player_season"'))
+    assert is_duplicate_season(error("UNIQUE constraint failed: player_stats.player_id, player_stats.season"))
+    assert not is_duplicate_season(error('insert or update on table "player_stats" violates foreign key constraint'))
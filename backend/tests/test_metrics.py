@@ -0,0 +1,73 @@
+# backend/tests/test_metrics.py
+from metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == 3.65
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+
+
+def test_registry_renders_the_prometheus_text_format():
+    from metrics import Registry
+
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1,))
+    latency.labels('/a "b"').observe(0.05)
+    registry.gauge("demo_items", "Demo items.", lambda: {("idle",): 2}, ("state",))
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Demo latency.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a \\"b\\"",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a \\"b\\"",le="+Inf"} 1',
+        'demo_seconds_sum{route="/a \\"b\\""} 0.05',
+        'demo_seconds_count{route="/a \\"b\\""} 1',
+        "# HELP demo_items Demo items.",
+        "# TYPE demo_items gauge",
+        'demo_items{state="idle"} 2',
+    ]
+
+
+def test_requests_are_measured_per_route_with_their_query_count(test_client):
+    import main
+
+    created = test_client.post("/api/players", json={"first_name": "A", "last_name": "B", "team": "AAA"})
+    assert created.status_code == 401 # Unauthenticated, but still measured
+    queries = main.request_queries.labels("GET", "/api/players/{player_id}")
+    before = queries.snapshot()
+
+    assert test_client.get("/api/players/1").status_code == 404
+    after = queries.snapshot()
+    assert after["count"] == before["count"] + 1
+    assert after["sum"] == before["sum"] + 1 # One SELECT for an unknown player
+
+    body = test_client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/players/{player_id}",status="404"}' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/players",status="401"}' in body
+    assert "# TYPE db_query_seconds histogram" in body
+    assert 'db_pool_connections{state="checked_out"}' in body
+
+
+def test_server_timing_header(test_client, monkeypatch):
+    import main
+
+    assert "server-timing" not in test_client.get("/api/players").headers
+    monkeypatch.setattr(main, "SERVER_TIMING", True)
+    # A different query string, so the list is not answered from the response cache
+    timing = test_client.get("/api/players?limit=5").headers["server-timing"]
+    assert timing.startswith("app;dur=")
+    assert 'db;dur=' in timing and 'desc="1 queries"' in timing
+
+
+def test_metrics_token(test_client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    assert test_client.get("/metrics").status_code == 401
+    assert test_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
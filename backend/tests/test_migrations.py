@@ -0,0 +1,95 @@
+# backend/tests/test_migrations.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import Index, create_engine, inspect, text
+
+import models
+from database import Base
+from migrations import MIGRATIONS, schema_migrations, upgrade
+
+
+def _baseline_database(path):
+    """A database as the baseline seeder left it: no migrations, every row of a traded player."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE players (id INTEGER PRIMARY KEY, first_name VARCHAR, last_name VARCHAR, team VARCHAR)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE player_stats (id INTEGER PRIMARY KEY, season VARCHAR, points_per_game FLOAT, "
+            "games_played INTEGER, player_id INTEGER REFERENCES players (id))"
+        ))
+    return engine
+
+
+def test_upgrade_adds_indexes_to_an_existing_database(tmp_path):
+    engine = _baseline_database(tmp_path / "old.db")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO players VALUES (1, 'Jane', 'Doe', 'AAA')"))
+        # Two lines of 2024 with the same games; the newest one wins
+        conn.execute(text(
+            "INSERT INTO player_stats VALUES (1, '2024', 10.0, 40, 1), (2, '2024', 12.0, 40, 1), (3, '2023', 8.0, 38, 1)"
+        ))
+
+    assert upgrade(engine) == [version for version, _ in MIGRATIONS]
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("player_stats")}
+    assert {"uq_player_stats_player_season", "ix_player_stats_season_player", "ix_player_stats_team_season"} <= index_names
+    with engine.connect() as conn:
+        # One line per season is kept, with the player's team backfilled
+        assert conn.execute(text("SELECT id, team FROM player_stats ORDER BY id")).all() == [(2, "AAA"), (3, "AAA")]
+
+    assert upgrade(engine) == [] # Already applied migrations are not run again
+    engine.dispose()
+
+
+def test_upgrade_keeps_the_season_total_of_traded_players(tmp_path):
+    engine = _baseline_database(tmp_path / "traded.db")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO players VALUES (1, 'Myisha', 'Hines-Allen', 'MIN')"))
+        # In file order, like data/wnba_combined_2024.json: MIN, TOT, WAS
+        conn.execute(text(
+            "INSERT INTO player_stats VALUES (1, '2024', 3.1, 15, 1), (2, '2024', 4.4, 36, 1), (3, '2024', 5.3, 21, 1)"
+        ))
+
+    upgrade(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, games_played FROM player_stats")).all() == [(2, 36)]
+    engine.dispose()
+
+
+def test_first_migration_ignores_indexes_added_to_the_models_later(tmp_path):
+    engine = _baseline_database(tmp_path / "later.db")
+    # An index on a column that only migration 0002 adds
+    index = Index("ix_player_stats_later", models.PlayerStat.__table__.c.team, models.PlayerStat.__table__.c.season)
+    try:
+        assert upgrade(engine) == [version for version, _ in MIGRATIONS]
+    finally:
+        models.PlayerStat.__table__.indexes.discard(index)
+    assert "ix_player_stats_later" not in {index["name"] for index in inspect(engine).get_indexes("player_stats")}
+    engine.dispose()
+
+
+def test_upgrade_on_an_empty_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    assert upgrade(engine) == [version for version, _ in MIGRATIONS]
+    assert "season_stat_summaries" in inspect(engine).get_table_names()
+    engine.dispose()
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set")
+def test_concurrent_upgrades_apply_each_migration_once():
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    schema_migrations.drop(engine, checkfirst=True)
+    Base.metadata.drop_all(bind=engine)
+    try:
+        # Workers of a new revision starting together
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            applied = list(pool.map(lambda _: upgrade(engine), range(4)))
+        assert sorted(applied, key=len) == [[], [], [], [version for version, _ in MIGRATIONS]]
+    finally:
+        schema_migrations.drop(engine, checkfirst=True)
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
@@ -0,0 +1,48 @@
+# backend/tests/test_model_registry.py
+import os
+import numpy as np
+
+from model_registry import ModelRegistry, KEEP_VERSIONS
+from similarity_index import SimilarityIndex, pack_keys
+
+
+def _index(*labels):
+    return SimilarityIndex.from_features(labels, np.eye(len(labels)), pack_keys(range(len(labels)), [2024] * len(labels)))
+
+
+def test_refresh_swaps_in_new_versions_only(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.refresh() is None
+
+    registry.publish(_index("A (2024)", "B (2024)"), version="v1")
+    first = registry.refresh()
+    assert first.version == "v1"
+    assert registry.refresh() is first # Unchanged CURRENT does not reload
+
+    registry.publish(_index("A (2024)", "B (2024)", "C (2024)"), version="v2")
+    second = registry.refresh()
+    assert second.version == "v2" and len(second.index) == 3
+    # A request holding the old version can still use it
+    assert first.index.top_k(0, 1)[0].tolist() == [1]
+
+
+def test_publish_prunes_old_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    for i in range(KEEP_VERSIONS + 2):
+        registry.publish(_index("A (2024)", "B (2024)"), version=f"v{i}")
+
+    versions = sorted(name for name in os.listdir(tmp_path) if os.path.isdir(tmp_path / name))
+    assert len(versions) == KEEP_VERSIONS
+    assert registry.current_version() == f"v{KEEP_VERSIONS + 1}"
+
+
+def test_refresh_skips_versions_without_keys(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.publish(_index("A (2024)", "B (2024)"), version="v1")
+    assert registry.refresh().version == "v1"
+
+    # A version published before rows were keyed by (player_id, season)
+    registry.publish(_index("A (2024)", "B (2024)"), version="v2")
+    os.remove(tmp_path / "v2" / "keys.npy")
+    assert registry.refresh().version == "v1"
+    assert ModelRegistry(str(tmp_path)).refresh() is None
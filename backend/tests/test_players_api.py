@@ -9,10 +9,82 @@ def test_create_player_as_authenticated_user(authenticated_client):
     assert response.status_code == 200
     assert response.json()["first_name"] == "Caitlin"
 
+
 def test_create_player_unauthenticated(test_client):
     """Tests that a non-logged-in user cannot create a player."""
     response = test_client.post(
         "/api/players",
         json={"first_name": "Caitlin", "last_name": "Clark", "team": "Indiana Fever"}
     )
-    assert response.status_code == 401 # Unauthorized
\ No newline at end of file
+    assert response.status_code == 401 # Unauthorized
+
+
+def test_get_players_loads_stats_without_n_plus_one(test_client, seed_players, capture_statements):
+    """Listing players costs a constant number of queries, not one per player."""
+    seed_players(10)
+    with capture_statements() as statements:
+        response = test_client.get("/api/players")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert all(len(player["stats"]) == 1 for player in response.json())
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 2
+
+
+def test_get_players_keyset_pagination(test_client, seed_players):
+    seed_players(5)
+    first_page = test_client.get("/api/players?limit=2")
+    assert [p["first_name"] for p in first_page.json()] == ["First0", "First1"]
+    next_after_id = first_page.headers["X-Next-After-Id"]
+
+    second_page = test_client.get(f"/api/players?limit=2&after_id={next_after_id}")
+    assert [p["first_name"] for p in second_page.json()] == ["First2", "First3"]
+
+    last_page = test_client.get(f"/api/players?limit=2&after_id={second_page.headers['X-Next-After-Id']}")
+    assert [p["first_name"] for p in last_page.json()] == ["First4"]
+    assert "X-Next-After-Id" not in last_page.headers
+
+
+def test_get_players_filters(test_client, seed_players):
+    seed_players(6)
+    by_team = test_client.get("/api/players?team=AAA").json()
+    assert [p["first_name"] for p in by_team] == ["First1", "First3", "First5"]
+
+    by_season = test_client.get("/api/players?season=2024&team=AAA").json()
+    assert [p["first_name"] for p in by_season] == ["First1"]
+
+    by_name = test_client.get("/api/players?name=Last4").json()
+    assert [p["first_name"] for p in by_name] == ["First4"]
+    assert len(test_client.get("/api/players?name=Fir").json()) == 6
+
+
+def test_get_players_by_name_prefix(authenticated_client, seed_players):
+    seed_players(3)
+    for first_name, last_name in [("Sika", "Koné"), ("Kon", "Last_1"), ("Lastly", "Known")]:
+        authenticated_client.post("/api/players", json={"first_name": first_name, "last_name": last_name, "team": "WAS"})
+
+    def names(prefix):
+        response = authenticated_client.get("/api/players", params={"name": prefix})
+        return sorted(f"{p['first_name']} {p['last_name']}" for p in response.json())
+
+    # Either name may start with the prefix, and on SQLite its case is ignored as before
+    assert names("Kon") == ["Kon Last_1", "Sika Koné"]
+    assert names("kno") == ["Lastly Known"]
+    assert names("Koné") == ["Sika Koné"]
+    assert names("Last1") == ["First1 Last1"]
+    # LIKE wildcards in the prefix are matched literally
+    assert names("Last_") == ["Kon Last_1"]
+    assert names("Last%") == []
+    assert names("Lasz") == []
+
+
+def test_player_list_payload_matches_the_response_model(test_client, seed_players):
+    """Players are encoded from row tuples; the output must still be exactly the documented schema."""
+    from pydantic import TypeAdapter
+    from main import Player
+
+    seed_players(3)
+    data = test_client.get("/api/players").json()
+    validated = TypeAdapter(list[Player]).validate_python(data)
+    assert [player.model_dump() for player in validated] == data
+    assert test_client.get(f"/api/players/{data[0]['id']}").json() == data[0]
@@ -0,0 +1,93 @@
+# backend/tests/test_response_cache.py
+import pytest
+
+from response_cache import CacheBackend, LRUBackend, LocalKeyValueStore, SharedBackend, backend_from_env
+
+
+def test_etag_and_not_modified(test_client):
+    first = test_client.get("/api/players")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and first.headers["cache-control"] == "no-cache"
+
+    second = test_client.get("/api/players", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_cached_response_is_served_without_querying(test_client, capture_statements):
+    test_client.get("/api/players?limit=5")
+    with capture_statements() as statements:
+        assert test_client.get("/api/players?limit=5").status_code == 200
+    assert statements == []
+
+
+def test_mutations_invalidate_cache(authenticated_client):
+    etag = authenticated_client.get("/api/players").headers["etag"]
+    authenticated_client.post("/api/players", json={"first_name": "Caitlin", "last_name": "Clark", "team": "IND"})
+
+    response = authenticated_client.get("/api/players", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [p["last_name"] for p in response.json()] == ["Clark"]
+
+
+def test_escaped_query_does_not_share_a_cache_entry(test_client, seed_players):
+    seed_players(2) # First1 is on AAA with a 2024 stat line
+    # One parameter whose value looks like two parameters once unescaped
+    assert test_client.get("/api/players?season=2024%26team%3DAAA").json() == []
+    players = test_client.get("/api/players?season=2024&team=AAA").json()
+    assert [player["first_name"] for player in players] == ["First1"]
+
+
+def test_lru_backend_evicts_and_expires():
+    backend = LRUBackend(maxsize=2)
+    backend.set("a", b"1", ttl=60)
+    backend.set("b", b"2", ttl=60)
+    backend.get("a") # "a" is now most recently used
+    backend.set("c", b"3", ttl=60)
+    assert backend.get("b") is None and backend.get("a") == b"1"
+
+    backend.set("d", b"4", ttl=0)
+    assert backend.get("d") is None
+
+
+def test_backends_must_implement_the_interface():
+    class GetOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+
+def test_shared_backend_invalidates_all_workers():
+    store = LocalKeyValueStore()
+    worker_a, worker_b = SharedBackend(store), SharedBackend(store)
+    worker_a.set("/api/players?", b"cached", ttl=60)
+    assert worker_b.get("/api/players?") == b"cached"
+
+    worker_b.invalidate()
+    assert worker_a.get("/api/players?") is None
+
+
+@pytest.mark.parametrize("backend", [LRUBackend(), SharedBackend(LocalKeyValueStore())], ids=["lru", "shared"])
+def test_values_computed_before_an_invalidation_are_not_stored(backend):
+    generation = backend.generation()
+    backend.invalidate() # e.g. a write or a model swap while the response was computed
+    backend.set("/api/players?", b"stale", ttl=60, generation=generation)
+    assert backend.get("/api/players?") is None
+
+    backend.set("/api/players?", b"fresh", ttl=60, generation=backend.generation())
+    assert backend.get("/api/players?") == b"fresh"
+
+
+def test_backend_is_chosen_by_the_environment(monkeypatch):
+    monkeypatch.delenv("RESPONSE_CACHE_REDIS_URL", raising=False)
+    monkeypatch.setenv("RESPONSE_CACHE_SIZE", "7")
+    backend = backend_from_env()
+    assert isinstance(backend, LRUBackend) and backend.maxsize == 7
+
+    pytest.importorskip("redis")
+    monkeypatch.setenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    assert isinstance(backend_from_env(), SharedBackend) # redis-py connects lazily
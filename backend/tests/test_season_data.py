@@ -0,0 +1,72 @@
+# backend/tests/test_season_data.py
+import json
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+import pytest
+
+import season_data
+from season_data import iter_chunks, iter_records, season_from_filename
+
+DATA_FILE = "data/wnba_combined_2024.json"
+
+
+def test_streaming_reader_matches_json_load():
+    with open(DATA_FILE) as f:
+        expected = json.load(f)
+    # A tiny read size forces records to be split across reads
+    with patch.object(season_data, "READ_SIZE", 7):
+        assert list(iter_records(DATA_FILE)) == expected
+
+
+def test_ndjson_records(tmp_path):
+    path = tmp_path / "wnba_combined_2025.ndjson"
+    path.write_text('{"Player": "A", "PTS": 1}\n\n{"Player": "B", "PTS": 2.5}\n')
+    assert [r["Player"] for r in iter_records(str(path))] == ["A", "B"]
+    assert season_from_filename(str(path)) == "2025"
+
+
+def test_malformed_array_is_rejected(tmp_path):
+    path = tmp_path / "wnba_combined_2024.json"
+    path.write_text('[{"Player": "A"}, {"Player": ')
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
+
+
+def test_iter_chunks():
+    assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_read_season_uses_typed_columnar_cache(tmp_path):
+    path = tmp_path / "wnba_combined_2024.json"
+    path.write_text(json.dumps([
+        {"Player": "Star Player*", "Team": "AAA", "PTS": 100, "WS/40": 0.2},
+        {"Player": None, "Team": "AAA", "PTS": 1},
+        {"Player": "Bench Player", "Team": "TOT", "PTS": None},
+    ]))
+    with patch.object(season_data, "CACHE_DIR", str(tmp_path / "cache")):
+        df, cached = season_data.read_season(str(path), ["Player", "PTS", "season", "MISSING"])
+        assert not cached
+        assert list(df.columns) == ["Player", "PTS", "season"]
+        assert df["Player"].tolist() == ["Star Player", "Bench Player"]
+        assert df["PTS"].dtype == "float64"
+        assert df["season"].tolist() == ["2024", "2024"]
+
+        _, cached = season_data.read_season(str(path), ["Player"])
+        assert cached
+
+        records = list(season_data.iter_season_records(str(path), ["Player", "Team", "PTS"]))
+        assert records[1] == {"Player": "Bench Player", "Team": "TOT"} # Nulls are left out
+
+
+def test_season_cache_is_written_chunk_by_chunk_with_one_schema(tmp_path):
+    path = tmp_path / "wnba_combined_2024.json"
+    # The second chunk lacks PTS and has a column the scraper never writes
+    path.write_text(json.dumps([{"Player": "A", "PTS": 10}, {"Player": "B", "PTS": 12}, {"Player": "C", "EXTRA": 1}]))
+    with patch.object(season_data, "CACHE_DIR", str(tmp_path / "cache")), \
+         patch.object(season_data, "iter_chunks", lambda records: iter_chunks(records, 2)):
+        cache_path, _ = season_data.season_cache(str(path))
+        parquet_file = pq.ParquetFile(cache_path)
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.schema_arrow == season_data.SEASON_SCHEMA
+        assert parquet_file.read(columns=["PTS"]).column("PTS").to_pylist() == [10.0, 12.0, None]
@@ -0,0 +1,74 @@
+# backend/tests/test_seed_database.py
+import json
+from unittest.mock import patch
+
+import pytest
+
+import models
+import season_data
+from database import SessionLocal
+from seed_database import seed_data
+
+
+def _write_season(tmp_path, year, rows):
+    path = tmp_path / f"wnba_combined_{year}.json"
+    path.write_text(json.dumps(rows))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def season_cache_dir(tmp_path):
+    with patch.object(season_data, "CACHE_DIR", str(tmp_path / "season_cache")):
+        yield
+
+
+ROWS_2024 = [
+    {"Player": "Jane Doe", "Team": "AAA", "G": 10, "PTS": 100, "TRB": 50, "AST": 20, "PER": 15.0},
+    {"Player": "Traded Player", "Team": "TOT", "G": 20, "PTS": 200, "PER": 12.0},
+    {"Player": "Traded Player", "Team": "BBB", "G": 12, "PTS": 120, "PER": 11.0},
+    {"Player": "Traded Player", "Team": "CCC", "G": 8, "PTS": 80, "PER": 13.0},
+    {"Player": "Totals Only", "Team": "TOT", "G": 5, "PTS": 10},
+]
+
+
+def test_seed_data_uses_totals_row_for_traded_players(db_session, tmp_path):
+    seed_data([_write_season(tmp_path, 2024, ROWS_2024)])
+
+    db = SessionLocal()
+    players = {f"{p.first_name} {p.last_name}": p for p in db.query(models.Player)}
+    assert set(players) == {"Jane Doe", "Traded Player"}
+    assert players["Traded Player"].team == "BBB"
+    assert [(s.season, s.games_played, s.points_per_game) for s in players["Traded Player"].stats] == [("2024", 20, 10.0)]
+    db.close()
+
+
+def test_seed_data_is_idempotent_upsert(db_session, tmp_path):
+    seed_data([_write_season(tmp_path, 2024, ROWS_2024)])
+    updated_rows = [dict(ROWS_2024[0], PTS=150)] + ROWS_2024[1:]
+    seed_data([
+        _write_season(tmp_path, 2024, updated_rows),
+        _write_season(tmp_path, 2025, [{"Player": "Jane Doe", "Team": "DDD", "G": 10, "PTS": 50}]),
+    ])
+
+    db = SessionLocal()
+    assert db.query(models.Player).count() == 2
+    jane = db.query(models.Player).filter(models.Player.first_name == "Jane").one()
+    assert jane.team == "DDD" # Latest season wins
+    assert sorted((s.season, s.points_per_game) for s in jane.stats) == [("2024", 15.0), ("2025", 5.0)]
+    assert db.query(models.PlayerStat).count() == 3
+    # Each season keeps its own team, and so do its team aggregates
+    assert sorted((s.season, s.team) for s in jane.stats) == [("2024", "AAA"), ("2025", "DDD")]
+    teams_2024 = {row.team for row in db.query(models.SeasonStatSummary).filter_by(season="2024", stat="points_per_game")}
+    assert teams_2024 == {"ALL", "AAA", "BBB"}
+    db.close()
+
+
+def test_seed_data_refreshes_season_leaders(db_session, tmp_path):
+    seed_data([_write_season(tmp_path, 2024, ROWS_2024)])
+
+    db = SessionLocal()
+    leaders = db.query(models.StatLeader).filter_by(season="2024", stat="points_per_game").order_by(models.StatLeader.rank)
+    assert [(leader.rank, leader.value) for leader in leaders] == [(1, 10.0), (2, 10.0)]
+    league = db.query(models.SeasonStatSummary).filter_by(season="2024", stat="points_per_game", team="ALL").one()
+    assert league.players == 2 and league.mean == 10.0
+    db.close()
@@ -1,37 +1,233 @@
 # backend/tests/test_similarity_api.py
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
-import pandas as pd
 import numpy as np
-from main import app, get_db
+from main import app
+from database import SessionLocal
 import models
 from auth.security import get_password_hash
+from model_registry import ModelRegistry
+from similarity_index import SimilarityIndex, pack_keys
 
-def test_get_similar_players(db_session):
-    mock_player_vectors = pd.DataFrame(index=['Player A (2024)', 'Player C (2024)'])
-    mock_matrix = np.array([[1.0, 0.95], [0.95, 1.0]])
-
-    with patch('main.joblib.load') as mock_joblib_load:
-        mock_joblib_load.side_effect = [mock_player_vectors, mock_matrix]
-
-        with TestClient(app) as client:
-            # Create user, log in, get headers
-            db = client.app.dependency_overrides[get_db]().__next__()
-            user = models.User(username="testuser", hashed_password=get_password_hash("password"))
-            db.add(user)
-            db.commit()
-            login_res = client.post("/auth/token", data={"username": "testuser", "password": "password"})
-            token = login_res.json()["access_token"]
-            headers = {"Authorization": f"Bearer {token}"}
-            db.close()
-
-            player_res = client.post("/api/players", headers=headers, json={"first_name": "Player", "last_name": "A", "team": "Team A"})
-            assert player_res.status_code == 200
-            player_id = player_res.json()["id"]
-
-            # Call the similarity endpoint
-            response = client.get(f"/api/players/{player_id}/seasons/2024/similar")
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data[0]["player_season_id"] == "Player C (2024)"
\ No newline at end of file
+
+def _index(labels, features, player_ids, season=2024):
+    return SimilarityIndex.from_features(labels, np.array(features), pack_keys(player_ids, [season] * len(player_ids)))
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """Points the app's model registry at an empty temporary model directory."""
+    with patch('model_registry.INDEX_PATH', str(tmp_path)):
+        yield str(tmp_path)
+
+
+def test_get_similar_players(db_session, model_dir):
+    mock_index = _index(['Player A (2024)', 'Player C (2024)'], [[1.0, 0.0], [0.95, 0.3]], [1, 2])
+    ModelRegistry(model_dir).publish(mock_index, version="v1")
+
+    with TestClient(app) as client:
+        # Create user, log in, get headers
+        db = SessionLocal()
+        user = models.User(username="testuser", hashed_password=get_password_hash("password"))
+        db.add(user)
+        db.commit()
+        login_res = client.post("/auth/token", data={"username": "testuser", "password": "password"})
+        token = login_res.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        db.close()
+
+        player_res = client.post(
+            "/api/players", headers=headers, json={"first_name": "Player", "last_name": "A", "team": "Team A"},
+        )
+        assert player_res.status_code == 200
+        player_id = player_res.json()["id"]
+        assert player_id == 1
+
+        # Call the similarity endpoint
+        response = client.get(f"/api/players/{player_id}/seasons/2024/similar")
+
+        assert response.status_code == 200
+        assert response.headers["X-Model-Version"] == "v1"
+        data = response.json()
+        assert data[0] == {
+            "player_id": 2, "season": "2024", "player_season_id": "Player C (2024)",
+            "similarity_score": data[0]["similarity_score"],
+        }
+
+        # Publish a rebuilt model and hot-reload it through the admin endpoint
+        ModelRegistry(model_dir).publish(_index(
+            ['Player A (2024)', 'Player C (2024)', 'Player D (2024)'], [[1.0, 0.0], [0.0, 1.0], [1.0, 0.01]], [1, 2, 3],
+        ), version="v2")
+        assert client.post("/api/admin/similarity/reload").status_code == 401
+        reload_res = client.post("/api/admin/similarity/reload", headers=headers)
+        assert reload_res.json() == {"version": "v2", "previous_version": "v1"}
+
+        response = client.get(f"/api/players/{player_id}/seasons/2024/similar")
+        assert response.headers["X-Model-Version"] == "v2"
+        assert response.json()[0]["player_season_id"] == "Player D (2024)"
+
+
+@pytest.fixture
+def published_model(model_dir):
+    ModelRegistry(model_dir).publish(_index(['Player A (2024)'], [[1.0]], [1]))
+
+
+def test_get_similar_players_rejects_k_above_cap(published_model, test_client):
+    response = test_client.get("/api/players/1/seasons/2024/similar?k=1000")
+    assert response.status_code == 422
+
+
+def test_get_similar_players_without_model(model_dir, test_client):
+    response = test_client.get("/api/players/1/seasons/2024/similar")
+    assert response.status_code == 503
+
+
+def test_get_similar_players_batch(db_session, model_dir):
+    mock_index = _index(
+        ['Player A (2024)', 'Player B (2024)', 'Player C (2024)'], [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1]], [1, 2, 3],
+    )
+    ModelRegistry(model_dir).publish(mock_index)
+    db = SessionLocal()
+    # Player A played 2024 for AAA and has moved to BBB since
+    player_a = models.Player(first_name="Player", last_name="A", team="BBB")
+    player_b = models.Player(first_name="Player", last_name="B", team="BBB")
+    player_a.stats = [models.PlayerStat(season="2024", team="AAA")]
+    player_b.stats = [models.PlayerStat(season="2024", team="BBB")]
+    db.add_all([player_a, player_b])
+    db.commit()
+    player_a_id, player_b_id = player_a.id, player_b.id
+    assert (player_a_id, player_b_id) == (1, 2)
+    db.close()
+
+    with TestClient(app) as client:
+        response = client.post("/api/similar:batch", json={
+            "queries": [
+                {"player_id": player_a_id, "season": "2024"},
+                {"player_id": player_b_id, "season": "2023"},
+                {"player_id": 9999, "season": "2024"},
+            ],
+            "k": 1,
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["similar"][0]["player_season_id"] for r in data[:1]] == ["Player C (2024)"]
+        assert data[1]["similar"] == [] and "not found in model" in data[1]["detail"]
+        assert "not found in model" in data[2]["detail"]
+
+        # A team filter selects the team's roster of the season, not its players today
+        response = client.post("/api/similar:batch", json={"season": "2024", "team": "BBB", "k": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1 and data[0]["player_id"] == player_b_id
+        assert len(data[0]["similar"]) == 2
+        response = client.post("/api/similar:batch", json={"season": "2024", "team": "AAA", "k": 1})
+        assert [result["player_id"] for result in response.json()] == [player_a_id]
+
+        # A filter matching more player-seasons than one batch holds is rejected, not cut short
+        with patch("main.MAX_BATCH_QUERIES", 1):
+            response = client.post("/api/similar:batch", json={"season": "2024", "k": 1})
+        assert response.status_code == 422 and "more than 1 player-seasons" in response.json()["detail"]
+
+
+def test_similar_players_are_resolved_by_id_without_the_database(published_model, model_dir, test_client, capture_statements):
+    # Two different players share a name; their rows are told apart by player id
+    ModelRegistry(model_dir).publish(_index(
+        ['Jane Doe (2024)', 'Jane Doe (2024)', 'Player B (2024)'], [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1]], [4, 9, 5],
+    ))
+    test_client.app.state.similarity_registry.refresh()
+
+    with capture_statements() as statements:
+        response = test_client.get("/api/players/9/seasons/2024/similar?k=1")
+
+    assert response.status_code == 200
+    assert [(item["player_id"], item["player_season_id"]) for item in response.json()] == [(5, "Player B (2024)")]
+    assert statements == []
+    assert test_client.get("/api/players/9/seasons/2023/similar").status_code == 404
+
+
+@pytest.fixture
+def weighted_model(model_dir):
+    # Row 0 is the query; row 1 matches its scoring, row 2 its rebounding and blocks
+    ModelRegistry(model_dir).publish(SimilarityIndex.from_features(
+        ['Query (2024)', 'Scorer (2024)', 'Big (2024)'],
+        np.array([[2.0, 1.0, 1.0], [2.0, -1.0, -1.0], [-2.0, 1.0, 1.0]]),
+        pack_keys([1, 2, 3], [2024] * 3), ['PTS', 'TRB', 'BLK'],
+    ))
+
+
+def test_similar_players_with_profile_and_weights(weighted_model, test_client):
+    def top(**params):
+        response = test_client.get("/api/players/1/seasons/2024/similar", params={"k": 1, **params})
+        assert response.status_code == 200, response.text
+        return response.json()[0]["player_season_id"]
+
+    assert top(profile="defense") == "Big (2024)"
+    assert top(weights="PTS:1") == "Scorer (2024)"
+    assert top(weights="TRB:3,BLK:2") == "Big (2024)"
+
+    batch = test_client.post(
+        "/api/similar:batch", json={"queries": [{"player_id": 1, "season": "2024"}], "k": 1, "weights": {"PTS": 1}},
+    )
+    assert batch.json()[0]["similar"][0]["player_season_id"] == "Scorer (2024)"
+
+
+@pytest.mark.parametrize("params", [
+    {"profile": "bench"}, {"weights": "AST:1"}, {"weights": "PTS"}, {"weights": "PTS:0"},
+    {"profile": "defense", "weights": "PTS:1"},
+])
+def test_similar_players_rejects_invalid_weights(weighted_model, test_client, params):
+    assert test_client.get("/api/players/1/seasons/2024/similar", params=params).status_code == 422
+
+
+def test_similar_careers(model_dir, test_client):
+    # Player 1's two seasons trend like player 2's first two; player 3 trends the other way
+    rows = [(1, 2023, [1.0, 0.0]), (1, 2024, [0.0, 1.0]), (2, 2020, [1.0, 0.1]), (2, 2021, [0.1, 1.0]),
+            (2, 2022, [5.0, 5.0]), (3, 2023, [0.0, 1.0]), (3, 2024, [1.0, 0.0]), (4, 2024, [1.0, 0.0])]
+    ModelRegistry(model_dir).publish(SimilarityIndex.from_features(
+        [f"Player {player_id} ({season})" for player_id, season, _ in rows], np.array([row[2] for row in rows]),
+        pack_keys([row[0] for row in rows], [row[1] for row in rows]), ["PTS", "TRB"],
+    ))
+    test_client.app.state.similarity_registry.refresh()
+
+    response = test_client.get("/api/players/1/career/similar")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["player_id"] for item in data] == [2, 3] # Player 4 has a single season
+    assert data[0]["player_name"] == "Player 2" and data[0]["seasons"] == ["2020", "2021"]
+
+    one_season = test_client.get("/api/players/1/career/similar", params={"seasons": 1}).json()
+    assert {item["player_id"] for item in one_season} == {2, 3, 4}
+    assert test_client.get("/api/players/1/career/similar", params={"seasons": 3}).status_code == 422
+    assert test_client.get("/api/players/99/career/similar").status_code == 404
+
+
+def test_similarity_and_model_load_are_timed(published_model, test_client, monkeypatch):
+    import main
+    import model_registry
+
+    assert model_registry.model_load_seconds.snapshot()["count"] >= 1
+    single = main.similarity_seconds.labels("single")
+    before = single.snapshot()["count"]
+
+    monkeypatch.setattr(main, "SERVER_TIMING", True)
+    response = test_client.get("/api/players/1/seasons/2024/similar?k=1")
+    assert response.status_code == 200
+    assert single.snapshot()["count"] == before + 1
+    assert "similarity;dur=" in response.headers["server-timing"]
+
+
+def test_app_starts_when_the_current_model_cannot_be_loaded(model_dir, db_session):
+    import os
+
+    ModelRegistry(model_dir).publish(_index(['Player A (2024)'], [[1.0]], [1]), version="old")
+    os.remove(os.path.join(model_dir, "old", "keys.npy"))
+    with TestClient(app) as client:
+        assert client.get("/api/players/1/seasons/2024/similar").status_code == 503
+        assert client.get("/api/players").status_code == 200
+
+    # Unreadable artifacts are logged too, instead of failing the startup
+    with open(os.path.join(model_dir, "old", "keys.npy"), "w") as f:
+        f.write("not an array")
+    with TestClient(app) as client:
+        assert client.get("/api/players/1/seasons/2024/similar").status_code == 503
@@ -0,0 +1,127 @@
+# backend/tests/test_similarity_index.py
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from similarity_index import SimilarityIndex, pack_keys
+
+
+def _keys(n, season=2024):
+    return pack_keys(range(1, n + 1), [season] * n)
+
+
+def test_scores_match_dense_cosine_similarity():
+    """A matrix-vector product over normalized rows gives the same scores as the old dense matrix."""
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(50, 9))
+    index = SimilarityIndex.from_features([f"P{i} (2024)" for i in range(50)], features, _keys(50))
+
+    dense = cosine_similarity(features)
+    for idx in (0, 17, 49):
+        np.testing.assert_allclose(index.scores(idx), dense[idx], atol=1e-5)
+
+
+def test_zero_vector_has_zero_similarity():
+    index = SimilarityIndex.from_features(["A (2024)", "B (2024)"], np.array([[0.0, 0.0], [1.0, 2.0]]), _keys(2))
+    assert index.scores(0).tolist() == [0.0, 0.0]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = SimilarityIndex.from_features(["A (2024)", "B (2024)"], np.array([[1.0, 0.0], [0.0, 1.0]]), _keys(2))
+    path = tmp_path / "similarity_model"
+    index.save(path)
+
+    loaded = SimilarityIndex.load(path)
+    assert isinstance(loaded.vectors.base, np.memmap) # Zero-copy, shared through the page cache
+    assert not loaded.vectors.flags.writeable
+    np.testing.assert_array_equal(loaded.vectors, index.vectors)
+    assert loaded.top_k(0, 1)[0].tolist() == [1]
+    assert loaded.labels == ["A (2024)", "B (2024)"]
+    assert loaded.find(2, "2024") == 1
+    with pytest.raises(KeyError):
+        loaded.find(3, "2024")
+
+
+def test_top_k_excludes_query_row_and_sorts_best_first():
+    # Row 1 duplicates row 0, so a rank-based "skip the first result" would drop the wrong row
+    features = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.5], [0.0, 1.0], [-1.0, 0.0]])
+    index = SimilarityIndex.from_features([f"P{i} (2024)" for i in range(5)], features, _keys(5))
+
+    rows, scores = index.top_k(0, 3)
+    assert rows.tolist() == [1, 2, 3]
+    assert scores[0] == pytest.approx(1.0)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_top_k_is_capped_at_index_size():
+    index = SimilarityIndex.from_features(["A (2024)", "B (2024)"], np.array([[1.0, 0.0], [0.0, 1.0]]), _keys(2))
+    rows, _ = index.top_k(0, 10)
+    assert rows.tolist() == [1]
+
+
+def test_top_k_batch_matches_single_queries():
+    rng = np.random.default_rng(2)
+    index = SimilarityIndex.from_features([f"P{i} (2024)" for i in range(300)], rng.normal(size=(300, 9)), _keys(300))
+    queries = [0, 5, 299, 5]
+
+    top, top_scores = index.top_k_batch(queries, 4)
+    assert top.shape == (4, 4)
+    for row, neighbours, scores in zip(queries, top, top_scores):
+        expected_rows, expected_scores = index.top_k(row, 4)
+        assert neighbours.tolist() == expected_rows.tolist()
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_find_by_player_id_and_season():
+    # Two different players share a name; only their ids tell them apart
+    keys = pack_keys([7, 3, 7, 12], [2023, 2024, 2024, 2024])
+    labels = ["Jane Doe (2023)", "Jane Doe (2024)", "Jane Doe (2024)", "B (2024)"]
+    index = SimilarityIndex.from_features(labels, np.eye(4), keys)
+
+    assert index.find(3, "2024") == 1 and index.find(7, "2024") == 2 and index.find(7, "2023") == 0
+    assert index.player_season(2) == (7, "2024")
+    assert index.find_rows([12, 12, 99], [2024, 2023, 2024]).tolist() == [3, -1, -1]
+    for player_id, season in [(3, "2023"), (3, "latest"), (99, "2024")]:
+        with pytest.raises(KeyError):
+            index.find(player_id, season)
+
+
+def test_duplicate_keys_are_rejected():
+    with pytest.raises(ValueError):
+        SimilarityIndex.from_features(["A (2024)", "A (2024)"], np.eye(2), pack_keys([1, 1], [2024, 2024]))
+
+
+def test_weighted_scores_match_weighted_cosine():
+    rng = np.random.default_rng(3)
+    features = rng.normal(size=(40, 3))
+    index = SimilarityIndex.from_features([f"P{i} (2024)" for i in range(40)], features, _keys(40), ["PTS", "TRB", "BLK"])
+
+    weights = index.feature_weights({"TRB": 3.0, "BLK": 1.0})
+    assert weights.tolist() == [0.0, 3.0, 1.0]
+    expected = cosine_similarity(features * np.sqrt(weights))
+    np.testing.assert_allclose(index.scores(7, weights), expected[7], atol=1e-5)
+    # Equal weights are plain cosine similarity
+    equal_weights = index.feature_weights({"PTS": 2, "TRB": 2, "BLK": 2})
+    np.testing.assert_allclose(index.scores(7, equal_weights), index.scores(7), atol=1e-5)
+
+    top, _ = index.top_k_batch([7], 3, weights)
+    assert top[0].tolist() == index.top_k(7, 3, weights)[0].tolist()
+    assert index.weighted_vectors(weights) is index.weighted_vectors(weights) # Cached per weights
+
+
+@pytest.mark.parametrize("weights", [{"AST": 1.0}, {"PTS": -1.0}, {"PTS": 0.0}])
+def test_invalid_feature_weights(weights):
+    index = SimilarityIndex.from_features(["A (2024)", "B (2024)"], np.eye(2), _keys(2), ["PTS", "TRB"])
+    with pytest.raises(ValueError):
+        index.feature_weights(weights)
+
+
+def test_features_survive_save_and_load(tmp_path):
+    index = SimilarityIndex.from_features(
+        ["A (2024)", "B (2024)"], np.array([[1.0, 2.0], [3.0, -1.0]]), _keys(2), ["PTS", "TRB"],
+    )
+    index.save(tmp_path / "model")
+
+    loaded = SimilarityIndex.load(tmp_path / "model")
+    assert loaded.feature_names == ["PTS", "TRB"]
+    np.testing.assert_allclose(loaded.features, [[1.0, 2.0], [3.0, -1.0]])
@@ -4,19 +4,27 @@ import { Link } from 'react-router-dom'; // Import Link
 import { Box, Button, TextField, Typography, Grid, Card, CardContent, CardActions } from '@mui/material';
 import { useAuth } from '../../AuthContext';
 
+const PAGE_SIZE = 100; // Players requested per page from the API
+
 function RosterPage() {
   const [players, setPlayers] = useState([]);
+  const [nextAfterId, setNextAfterId] = useState(null); // Cursor of the next page, null on the last one
   const [firstName, setFirstName] = useState('');
   const [lastName, setLastName] = useState('');
   const [team, setTeam] = useState('');
   const [editingPlayer, setEditingPlayer] = useState(null);   // State to track which player is being edited
   const auth = useAuth();
 
-  const fetchPlayers = () => {
-    fetch(`${process.env.REACT_APP_API_BASE_URL}/api/players`)
-      .then(response => response.json())
-      .then(data => {
-        setPlayers(data);
+  // Fetches one page of players; without an afterId it reloads the list from the start
+  const fetchPlayers = (afterId = null) => {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (afterId !== null) params.set('after_id', afterId);
+
+    fetch(`${process.env.REACT_APP_API_BASE_URL}/api/players?${params}`)
+      .then(response => response.json().then(data => ({ data, next: response.headers.get('X-Next-After-Id') })))
+      .then(({ data, next }) => {
+        setPlayers(previous => afterId === null ? data : [...previous, ...data]);
+        setNextAfterId(next); // The API only sends it when another page follows
       })
       .catch(error => console.error('Error fetching players:', error));
   };
@@ -138,6 +146,12 @@ function RosterPage() {
           </Grid>
         ))}
       </Grid>
+
+      {nextAfterId !== null && (
+        <Box sx={{ mt: 3, textAlign: 'center' }}>
+          <Button variant="outlined" onClick={() => fetchPlayers(nextAfterId)}>Load More</Button>
+        </Box>
+      )}
     </Box>
   );
 }